@@ -1,3 +1,14 @@
+import hashlib
+import math
+import os
+import time
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".solver_cache")
+CACHE_VERSION = 2  # Part of the cache key; bumped when solver results change
+
+
 def find_n_and_queue_size(V, d=10, p=0.25, epsilon=1e-80, max_k=1000):
     """
     Determines the smallest n such that after k compactions,
@@ -33,3 +44,138 @@ def find_n_and_queue_size(V, d=10, p=0.25, epsilon=1e-80, max_k=1000):
         }
 
     return {"converged": False}
+
+
+def _compactions_needed(n, V, alpha, epsilon):
+    """
+    Smallest k >= 1 with V - S_k <= epsilon * V. The recurrence
+    S_{k+1} = S_k + n * alpha * (V - S_k) / V gives V - S_k = V * (1 - r)^k with
+    r = n * alpha / V, so k = ceil(ln(epsilon) / ln(1 - r)); one step is enough once r >= 1.
+    """
+    r = n * alpha / V
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.ceil(np.log(epsilon) / np.log1p(-np.minimum(r, 1)))
+    return np.where(r >= 1, 1, np.maximum(k, 1))
+
+
+def compactions_needed(n, V, d=10, p=0.25, epsilon=1e-80):
+    """Vectorized number of compactions after which n-iteration windows have seen (1 - epsilon) * V vertices"""
+    n, V, d, p, epsilon = (np.asarray(x, dtype=np.float64) for x in (n, V, d, p, epsilon))
+    return _compactions_needed(n, V, d * p, epsilon).astype(np.int64)
+
+
+def solve_n_and_queue_size(V, d=10, p=0.25, epsilon=1e-80, max_k=1000, max_n=4999):
+    """
+    Vectorized find_n_and_queue_size: V, d, p and epsilon may be NumPy arrays
+    (broadcast together) and every point of the grid is solved at once.
+
+    n converges when (1 - n * alpha / V)^max_k <= epsilon, i.e.
+    n >= V * (1 - epsilon^(1 / max_k)) / alpha, so the smallest n is a closed
+    form, corrected by one step where rounding puts it off by one.
+
+    find_n_and_queue_size tracks S in floating point; for epsilon below the
+    float64 resolution (about 1e-16) it can only stop once S rounds to exactly
+    V and returns a larger n than this exact bound.
+
+    Returns: dict of arrays n, queue_size, num_compactions, seen_vertices and
+    converged (n is 0 where no n <= max_n converges)
+    """
+    V, d, p, epsilon = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (V, d, p, epsilon)))
+    alpha = d * p
+
+    n = np.maximum(1, np.ceil(V * -np.expm1(np.log(epsilon) / max_k) / alpha))
+    n = np.where((n > 1) & (_compactions_needed(n - 1, V, alpha, epsilon) <= max_k), n - 1, n)
+    n = np.where(_compactions_needed(n, V, alpha, epsilon) > max_k, n + 1, n)
+
+    k = _compactions_needed(n, V, alpha, epsilon)
+    # The closed form V * (1 - (1 - r)^k) can land just below an exact integer,
+    # so S follows the loop's recurrence (and rounding) for the k steps instead
+    seen = np.zeros_like(n)
+    for step in range(int(k.max(initial=0))):
+        seen = np.where(step < k, seen + n * alpha * ((V - seen) / V), seen)
+    converged = n <= max_n
+    return {
+        "n": np.where(converged, n, 0).astype(np.int64),
+        "queue_size": np.where(converged, np.ceil(V) + n * d, 0).astype(np.int64),
+        "num_compactions": np.where(converged, k, 0).astype(np.int64),
+        "seen_vertices": np.where(converged, seen, 0).astype(np.int64),
+        "converged": converged,
+    }
+
+
+def solve_cached(V, d=10, p=0.25, epsilon=1e-80, max_k=1000, max_n=4999, cache_dir=CACHE_DIR):
+    """
+    solve_n_and_queue_size with an on-disk cache: results are stored as .npz
+    files keyed by a hash of the parameter arrays, so repeating a capacity
+    planning grid only loads the file.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (V, d, p, epsilon)))
+    key = hashlib.sha1()
+    for array in arrays:
+        key.update(str(array.shape).encode())
+        key.update(np.ascontiguousarray(array).tobytes())
+    key.update(f"{max_k},{max_n},{CACHE_VERSION}".encode())
+    path = os.path.join(cache_dir, key.hexdigest() + ".npz")
+
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return {name: cached[name] for name in cached.files}
+
+    result = solve_n_and_queue_size(*arrays, max_k=max_k, max_n=max_n)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(path, **result)
+    return result
+
+
+def check_against_loop(cases=((100, 38, 1.0, 1e-6, 2), (100, 10, 0.25, 1e-6, 1000), (1000, 5, 0.5, 1e-3, 50),
+                              (5000, 20, 0.75, 1e-9, 200), (250, 40, 0.1, 1e-12, 1000))):
+    """
+    Check solve_n_and_queue_size against find_n_and_queue_size on
+    (V, d, p, epsilon, max_k) cases; epsilon stays above the float64
+    resolution, where the loop cannot stop (see solve_n_and_queue_size).
+    """
+    for V, d, p, epsilon, max_k in cases:
+        reference = find_n_and_queue_size(V, d, p, epsilon, max_k)
+        result = {name: value.item() for name, value in solve_n_and_queue_size(V, d, p, epsilon, max_k).items()}
+        if not reference["converged"]:
+            result = {"converged": result["converged"]}
+        if result != reference:
+            raise AssertionError(f"V = {V}, d = {d}, p = {p}, epsilon = {epsilon}, max_k = {max_k}: "
+                                 f"{result} vs loop {reference}")
+    print(f"solve_n_and_queue_size matched the loop on {len(cases)} cases")
+
+
+def main():
+    check_against_loop()
+    V = np.array([100, 1000, 10_000, 100_000])
+    d = 10
+    p = 0.25
+    epsilon = 1e-6
+
+    print(f"d = {d}, p = {p}, epsilon = {epsilon}\n")
+    print(f"{'V':>8} {'n':>6} {'queue':>8} {'compactions':>12} {'loop n':>7} {'loop (s)':>9}")
+    result = solve_n_and_queue_size(V, d, p, epsilon)
+    for i, vertices in enumerate(V.tolist()):
+        start = time.perf_counter()
+        reference = find_n_and_queue_size(vertices, d, p, epsilon)
+        elapsed = time.perf_counter() - start
+        print(f"{vertices:>8} {result['n'][i]:>6} {result['queue_size'][i]:>8} {result['num_compactions'][i]:>12} "
+              f"{reference.get('n', '-'):>7} {elapsed:>9.3f}")
+
+    # Capacity planning grid: 200 graph sizes x 4 degrees x 4 probabilities x 5 epsilons
+    grid = np.meshgrid(np.geomspace(100, 1e7, 200).round(), [5, 10, 20, 40], [0.1, 0.25, 0.5, 0.75],
+                       [1e-3, 1e-6, 1e-9, 1e-12, 1e-80], indexing="ij")
+    start = time.perf_counter()
+    result = solve_n_and_queue_size(*grid)
+    elapsed = time.perf_counter() - start
+    print(f"\nSolved {result['n'].size} grid points in {elapsed * 1000:.1f} ms "
+          f"({np.count_nonzero(result['converged'])} converge with n <= 4999)")
+
+    for attempt in ("first", "repeated"):
+        start = time.perf_counter()
+        solve_cached(*grid)
+        print(f"Disk-cached solve, {attempt} call: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import itertools
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm and test graph generator
+
+# Read-only GraphAlgorithm attached to the shared matrix in each worker process
+_worker_algorithm = None
+_worker_segments = []
+
+
+def _share_array(array):
+    """Copy an array into a new shared memory segment"""
+    segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+    shared[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _attach_array(spec):
+    name, shape, dtype = spec
+    segment = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    array.flags.writeable = False
+    return segment, array
+
+
+def _init_worker(matrix_spec, row_start_spec, row_count_spec, V, E, dummy_row_count):
+    global _worker_algorithm, _worker_segments
+    attached = [_attach_array(spec) for spec in (matrix_spec, row_start_spec, row_count_spec)]
+    _worker_segments = [segment for segment, _ in attached]
+    matrix, row_start, row_count = (array for _, array in attached)
+    _worker_algorithm = graph_algorithm.GraphAlgorithm.from_arrays(matrix, row_start, row_count, V, E, dummy_row_count)
+
+
+def _run_configuration(configuration):
+    start_vertex, n, compaction_del, compaction_engine = configuration
+    algorithm = _worker_algorithm
+    start = time.perf_counter()
+    algorithm.run_algorithm(start_vertex, n, compaction_del, verbosity=graph_algorithm.SILENT,
+                            compaction_engine=compaction_engine)
+    return {
+        "start_vertex": start_vertex,
+        "n": n,
+        "compaction_del": compaction_del,
+        "compaction_engine": compaction_engine,
+        "outer_loop_count": algorithm.get_outer_loop_count(),
+        "max_queue_size": algorithm.get_max_queue_size(),
+        "max_real_queue_size": algorithm.get_max_real_queue_size(),
+        "vertices_reached": int(np.count_nonzero(algorithm.vertex_bits)),
+        "vertices_processed": len(algorithm.get_processed_vertices()),
+        "dropped_vertices": algorithm.get_dropped_vertex_count(),
+        "dropped_real": algorithm.get_dropped_vertex_count() > 0,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def sweep(algorithm, n_values, compaction_del_values, start_vertices=(1,), compaction_engine="partition",
+          workers=None):
+    """
+    Run algorithm.run_algorithm over the grid of n x compaction_del x start vertex.
+
+    The d-normalized matrix built by `algorithm` is copied once into shared
+    memory and attached read-only by every worker in the process pool, so the
+    graph is neither rebuilt nor pickled per configuration.
+
+    Returns: list of result dicts, one per configuration, in grid order.
+    `dropped_real` flags configurations where compaction discarded queued vertices.
+    """
+    configurations = [
+        (start_vertex, n, compaction_del, compaction_engine)
+        for n, compaction_del, start_vertex in itertools.product(n_values, compaction_del_values, start_vertices)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    segments = []
+    try:
+        specs = []
+        for array in (algorithm.adjacency_matrix, algorithm.row_start, algorithm.row_count):
+            segment, spec = _share_array(np.ascontiguousarray(array))
+            segments.append(segment)
+            specs.append(spec)
+
+        initargs = (*specs, algorithm.V, algorithm.E, algorithm.get_dummy_row_count())
+        with Pool(processes=workers, initializer=_init_worker, initargs=initargs) as pool:
+            chunksize = max(1, len(configurations) // (4 * workers))
+            return pool.map(_run_configuration, configurations, chunksize=chunksize)
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def main():
+    V = 2000
+    target_E = 3000
+    print(f"Generating test graph with {V} vertices and ~{target_E} edges...")
+    edges = graph_algorithm.generate_large_test_case(V, target_E)
+    algorithm = graph_algorithm.GraphAlgorithm(edges, V, len(edges))
+    print(f"d = {algorithm.d}, matrix size: {len(algorithm.adjacency_matrix)} x {algorithm.d + 1}")
+
+    n_values = [1, 2, 5, 10, 20]
+    compaction_del_values = [10, 50, 100, 500]
+    start_vertices = [1, V // 2, V]
+    workers = os.cpu_count() or 1
+    print(f"Sweeping {len(n_values) * len(compaction_del_values) * len(start_vertices)} configurations "
+          f"on {workers} worker(s)...\n")
+
+    start = time.perf_counter()
+    results = sweep(algorithm, n_values, compaction_del_values, start_vertices, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'start':>6} {'n':>4} {'del':>5} {'loops':>7} {'max q':>7} {'max real':>9} {'reached':>8} {'dropped':>8}")
+    for result in results:
+        flag = "  <- dropped real vertices" if result["dropped_real"] else ""
+        print(f"{result['start_vertex']:>6} {result['n']:>4} {result['compaction_del']:>5} "
+              f"{result['outer_loop_count']:>7} {result['max_queue_size']:>7} {result['max_real_queue_size']:>9} "
+              f"{result['vertices_reached']:>8} {result['dropped_vertices']:>8}{flag}")
+    print(f"\nSweep finished in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
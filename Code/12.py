@@ -0,0 +1,269 @@
+import math
+import time
+
+import numpy as np
+
+from siblings import load_script
+
+scan = load_script(15)  # Vectorized constant-pattern scan primitives
+
+
+class LinearScanArray:
+    """
+    Baseline ObliviousArray: every read and write touches every entry, as in
+    the obliviousGet / obliviousConditionalWrite pseudocode of 5.py. The batch
+    methods serve k accesses with a single sweep (15.py).
+    """
+
+    def __init__(self, size, fill=0, dtype=np.int64):
+        self.size = size
+        self.data = np.full(size, fill, dtype=dtype)
+
+    def obliviousRead(self, index):
+        return scan.oblivious_select(self.data, index)
+
+    def obliviousWrite(self, index, value):
+        self.obliviousConditionalWrite(index, value, True)
+
+    def obliviousConditionalWrite(self, index, value, condition):
+        scan.oblivious_write(self.data, index, value, condition)
+
+    def obliviousReadBatch(self, indices):
+        return scan.oblivious_select_batch(self.data, indices)
+
+    def obliviousConditionalWriteBatch(self, indices, values, conditions):
+        scan.oblivious_write_batch(self.data, indices, values, conditions)
+
+
+class _PositionArray:
+    """Plain position map for the innermost Path ORAM level; -1 = not assigned yet"""
+
+    def __init__(self, size):
+        self.leaves = np.full(size, -1, dtype=np.int64)
+
+    def swap(self, index, new_leaf):
+        old_leaf = self.leaves[index].item()
+        self.leaves[index] = new_leaf
+        return old_leaf
+
+    def stash_sizes(self):
+        return []
+
+
+class _PositionORAM:
+    """Recursive position map: leaf labels packed positions_per_block to a Path ORAM block"""
+
+    def __init__(self, size, positions_per_block, recursion_threshold, bucket_size, rng):
+        self.positions_per_block = positions_per_block
+        self.oram = PathORAM(math.ceil(size / positions_per_block), positions_per_block, -1,
+                             positions_per_block, recursion_threshold, bucket_size, rng)
+
+    def swap(self, index, new_leaf):
+        block, offset = divmod(index, self.positions_per_block)
+        old_leaf = []
+
+        def update(leaves):
+            old_leaf.append(leaves[offset].item())
+            leaves = leaves.copy()
+            leaves[offset] = new_leaf
+            return leaves
+
+        self.oram.access(block, update)
+        return old_leaf[0]
+
+    def stash_sizes(self):
+        return [self.oram.max_stash_size] + self.oram.position_map.stash_sizes()
+
+
+class PathORAM:
+    """
+    Path ORAM (Stefanov et al.) over `size` blocks of `block_width` values.
+
+    Blocks live in a binary tree of buckets holding bucket_size blocks each.
+    Every block is mapped to a random leaf and is always on the path to that
+    leaf or in the stash. An access reads one whole path into the stash,
+    remaps the block to a fresh random leaf and writes the path back,
+    pushing stash blocks as deep as their leaves allow. When the position map
+    has more than recursion_threshold entries it is itself stored in a
+    smaller Path ORAM, positions_per_block labels per block.
+
+    Blocks that were never written hold `fill`; they enter the tree on first access.
+    The NumPy generator stands in for a cryptographic RNG in this model.
+    """
+
+    def __init__(self, size, block_width=1, fill=0, positions_per_block=16, recursion_threshold=1024,
+                 bucket_size=4, rng=None):
+        self.size = size
+        self.block_width = block_width
+        self.fill = np.full(block_width, fill, dtype=np.int64)
+        self.bucket_size = bucket_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.height = max(0, math.ceil(math.log2(max(size, 1))))
+        self.num_leaves = 1 << self.height
+        # Heap layout: bucket 1 is the root, the children of bucket b are 2b and 2b + 1
+        self.bucket_ids = np.full((2 * self.num_leaves, bucket_size), -1, dtype=np.int64)
+        self.bucket_leaves = np.zeros((2 * self.num_leaves, bucket_size), dtype=np.int64)
+        self.bucket_values = np.zeros((2 * self.num_leaves, bucket_size, block_width), dtype=np.int64)
+
+        if size > recursion_threshold:
+            self.position_map = _PositionORAM(size, positions_per_block, recursion_threshold, bucket_size, self.rng)
+        else:
+            self.position_map = _PositionArray(size)
+
+        self.stash = {}  # block id -> (leaf, value vector)
+        self.max_stash_size = 0
+        self.accesses = 0
+
+    def _path(self, leaf):
+        """Bucket indices from the root (level 0) down to the leaf (level height)"""
+        node = leaf + self.num_leaves
+        return np.array([node >> (self.height - level) for level in range(self.height + 1)])
+
+    def access(self, index, update=None):
+        """
+        Read block `index` and replace its value with update(old_value) when
+        update is given. The same path read and write happen either way.
+
+        Returns: the old value vector
+        """
+        self.accesses += 1
+        new_leaf = self.rng.integers(self.num_leaves).item()
+        leaf = self.position_map.swap(index, new_leaf)
+        if leaf < 0:
+            leaf = self.rng.integers(self.num_leaves).item()  # Not stored yet: read a random path
+
+        # Read the whole path into the stash
+        path = self._path(leaf)
+        ids = self.bucket_ids[path]
+        for level, slot in zip(*np.nonzero(ids >= 0)):
+            bucket = path[level]
+            self.stash[ids[level, slot].item()] = (self.bucket_leaves[bucket, slot].item(),
+                                                   self.bucket_values[bucket, slot].copy())
+        self.bucket_ids[path] = -1
+
+        _, value = self.stash.get(index, (None, self.fill))
+        self.stash[index] = (new_leaf, update(value) if update is not None else value)
+
+        self._write_path(leaf, path)
+        self.max_stash_size = max(self.max_stash_size, len(self.stash))
+        return value
+
+    def _write_path(self, leaf, path):
+        """Greedily evict stash blocks into the path, deepest bucket first"""
+        if not self.stash:
+            return
+        block_ids = np.fromiter(self.stash, dtype=np.int64, count=len(self.stash))
+        block_leaves = np.array([self.stash[block][0] for block in block_ids.tolist()], dtype=np.int64)
+        # Deepest level shared by the path to the block's leaf and the accessed path
+        depth = self.height - np.array([int(x).bit_length() for x in (block_leaves ^ leaf).tolist()], dtype=np.int64)
+
+        placed = np.zeros(len(block_ids), dtype=bool)
+        for level in range(self.height, -1, -1):
+            eligible = np.flatnonzero(~placed & (depth >= level))[:self.bucket_size]
+            if len(eligible) == 0:
+                continue
+            bucket = path[level]
+            for slot, candidate in enumerate(eligible.tolist()):
+                block = block_ids[candidate].item()
+                block_leaf, value = self.stash.pop(block)
+                self.bucket_ids[bucket, slot] = block
+                self.bucket_leaves[bucket, slot] = block_leaf
+                self.bucket_values[bucket, slot] = value
+            placed[eligible] = True
+
+    def stash_size(self):
+        """Blocks left in the stash after the last eviction"""
+        return len(self.stash)
+
+
+class PathORAMArray:
+    """ObliviousArray backed by Path ORAM; one access per read, write or conditional write"""
+
+    def __init__(self, size, fill=0, dtype=np.int64, rng=None, **oram_options):
+        self.size = size
+        self.dtype = dtype
+        self.oram = PathORAM(size, 1, fill, rng=rng, **oram_options)
+
+    def obliviousRead(self, index):
+        return self.dtype(self.oram.access(index)[0]).item()
+
+    def obliviousWrite(self, index, value):
+        self.obliviousConditionalWrite(index, value, True)
+
+    def obliviousConditionalWrite(self, index, value, condition):
+        self.oram.access(index, lambda old: np.where(bool(condition), np.int64(value), old))
+
+    def obliviousReadBatch(self, indices):
+        return np.array([self.obliviousRead(index) for index in np.asarray(indices).tolist()], dtype=self.dtype)
+
+    def obliviousConditionalWriteBatch(self, indices, values, conditions):
+        values = np.broadcast_to(values, np.shape(indices))
+        for index, value, condition in zip(np.asarray(indices).tolist(), values.tolist(), np.asarray(conditions).tolist()):
+            self.obliviousConditionalWrite(index, value, condition)
+
+    def stash_size(self):
+        """Current number of blocks in the data ORAM stash"""
+        return self.oram.stash_size()
+
+    def max_stash_sizes(self):
+        """Largest stash size seen by the data ORAM and each recursive position map level"""
+        return [self.oram.max_stash_size] + self.oram.position_map.stash_sizes()
+
+
+OBLIVIOUS_ARRAYS = {
+    "linear": LinearScanArray,
+    "path_oram": PathORAMArray,
+}
+
+
+def make_oblivious_array(size, backend="linear", fill=0, **options):
+    if backend not in OBLIVIOUS_ARRAYS:
+        raise ValueError(f"Unknown ObliviousArray backend {backend!r}, choose from {sorted(OBLIVIOUS_ARRAYS)}")
+    return OBLIVIOUS_ARRAYS[backend](size, fill=fill, **options)
+
+
+def benchmark_access(sizes, accesses=200, seed=42):
+    """
+    Time random conditional writes and reads on both backends.
+
+    Returns: list of dicts with size, linear and path_oram microseconds per
+    access and the largest stash size seen at each Path ORAM level
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        indices = rng.integers(0, size, accesses).tolist()
+        result = {"size": size}
+        for backend in OBLIVIOUS_ARRAYS:
+            array = make_oblivious_array(size, backend)
+            start = time.perf_counter()
+            for step, index in enumerate(indices):
+                array.obliviousConditionalWrite(index, step, step % 2 == 0)
+                array.obliviousRead(index)
+            result[backend] = (time.perf_counter() - start) / (2 * accesses) * 1e6
+            if backend == "path_oram":
+                result["max_stash"] = array.max_stash_sizes()
+        results.append(result)
+    return results
+
+
+def main():
+    sizes = [2 ** k for k in range(8, 23, 2)]
+    print("Microseconds per access: linear scan vs Path ORAM\n")
+    print(f"{'size':>10} {'linear':>10} {'path_oram':>10}  max stash per level")
+
+    crossover = None
+    for result in benchmark_access(sizes):
+        print(f"{result['size']:>10} {result['linear']:>10.1f} {result['path_oram']:>10.1f}  {result['max_stash']}")
+        if crossover is None and result["path_oram"] < result["linear"]:
+            crossover = result["size"]
+
+    if crossover is None:
+        print("\nLinear scan was faster at every size tested")
+    else:
+        print(f"\nPath ORAM beats linear scan from about {crossover} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import time
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm and test graph generator
+oblivious_queue = load_script(9)  # ObliviousQueue ring buffer
+oblivious_array = load_script(12)  # Linear-scan and Path ORAM ObliviousArray backends
+okvs = load_script(13)  # Band OKVS
+scan = load_script(15)  # Vectorized constant-pattern scan primitives
+multi_source = load_script(11)  # Batched BFS, used as the distance reference
+
+DUMMY_VERTEX = 0
+UNREACHED = -1  # Distance of vertices the traversal never reaches
+
+
+class MatrixRowStore:
+    """Row store over the GraphAlgorithm matrix; obliviousGet scans every row like 5.py"""
+
+    def __init__(self, algorithm):
+        self.rows = algorithm.adjacency_matrix[:, 1:]
+
+    def obliviousGet(self, key):
+        return scan.oblivious_select(self.rows, key)
+
+
+class OKVSRowStore:
+    """Row store backed by the band OKVS of 13.py, keyed by matrix row index"""
+
+    def __init__(self, algorithm, **options):
+        self.store = okvs.BandOKVS.from_graph_algorithm(algorithm, **options)
+
+    def obliviousGet(self, key):
+        return self.store.obliviousGet(key)
+
+
+ROW_STORES = {
+    "matrix": MatrixRowStore,
+    "okvs": OKVSRowStore,
+}
+
+
+class ObliviousBFS:
+    """
+    Executable version of obliviousBFS from 5.py over the d-normalized rows of
+    a GraphAlgorithm.
+
+    Each iteration processes exactly one d-wide row: it conditionally dequeues
+    the next vertex when the current one has no rows left, reads one row from
+    the row store (an all-dummy row when there is nothing to do) and runs the
+    same read / conditional write / conditional enqueue sequence on all d
+    slots, batched into one sweep per array. Every vertex owns at least one
+    row, so the matrix row count (2V) iterations cover every reachable row and
+    the schedule depends only on (V, d).
+
+    visited, distance, parent, row_start and row_count are ObliviousArrays from
+    12.py ("linear" or "path_oram"); rows come from a row store ("matrix" or
+    "okvs"); queue_factory(capacity) builds the queue, by default the
+    ObliviousQueue of 9.py.
+    """
+
+    def __init__(self, algorithm, array_backend="linear", row_store="matrix", queue_factory=None, **array_options):
+        if row_store not in ROW_STORES:
+            raise ValueError(f"Unknown row store {row_store!r}, choose from {sorted(ROW_STORES)}")
+        self.algorithm = algorithm
+        self.V = algorithm.V
+        self.d = algorithm.d
+        self.array_backend = array_backend
+        self.array_options = array_options
+        self.rows = ROW_STORES[row_store](algorithm)
+        self.queue_factory = queue_factory or oblivious_queue.ObliviousQueue
+        self.iterations = len(algorithm.adjacency_matrix)
+        # Dummy iterations read the last matrix row. select_d allows up to 2V used
+        # rows, so it can belong to a vertex; that is harmless, as every slot of a
+        # dummy read fails `real` in should_process
+        self.dummy_key = self.iterations - 1
+
+    def _array(self, fill=0):
+        return oblivious_array.make_oblivious_array(self.V + 1, self.array_backend, fill, **self.array_options)
+
+    def _load(self, values):
+        array = self._array()
+        array.obliviousConditionalWriteBatch(np.arange(self.V + 1), values, np.ones(self.V + 1, dtype=bool))
+        return array
+
+    def run(self, start_vertex):
+        """
+        Traverse from start_vertex for a fixed number of iterations.
+
+        Returns: dict with `distance` and `parent` (NumPy arrays indexed by
+        vertex id, index 0 unused; UNREACHED / 0 where not reached),
+        `iterations` and `seconds`
+        """
+        started = time.perf_counter()
+        row_start = self._load(self.algorithm.row_start)
+        row_count = self._load(self.algorithm.row_count)
+        visited = self._array()
+        distance = self._array(UNREACHED)
+        parent = self._array()
+        queue = self.queue_factory(self.V + 1)  # Each vertex is enqueued at most once
+
+        queue.conditional_append(start_vertex, True)
+        visited.obliviousWrite(start_vertex, 1)
+        distance.obliviousWrite(start_vertex, 0)
+
+        vertex = DUMMY_VERTEX
+        key = 0
+        remaining = 0
+        earlier_slot = np.tri(self.d, k=-1, dtype=bool)  # [i, j]: slot j comes before slot i
+        for _ in range(self.iterations):
+            need_next = remaining == 0
+            candidate = queue.conditional_dequeue(need_next)
+            candidate_start = row_start.obliviousRead(candidate)
+            candidate_count = row_count.obliviousRead(candidate)
+            vertex = candidate if need_next else vertex
+            key = candidate_start if need_next else key
+            remaining = candidate_count if need_next else remaining
+
+            real = remaining > 0
+            neighbors = self.rows.obliviousGet(key if real else self.dummy_key)
+            next_distance = distance.obliviousRead(vertex) + 1
+
+            # Process all d neighbors (real and dummy); a repeated neighbor only
+            # counts once, as in the one-slot-at-a-time loop of 5.py
+            is_visited = visited.obliviousReadBatch(neighbors) != 0
+            repeated = ((neighbors[:, None] == neighbors) & earlier_slot).any(axis=1)
+            should_process = real & (neighbors != DUMMY_VERTEX) & ~is_visited & ~repeated
+            visited.obliviousConditionalWriteBatch(neighbors, 1, should_process)
+            distance.obliviousConditionalWriteBatch(neighbors, next_distance, should_process)
+            parent.obliviousConditionalWriteBatch(neighbors, vertex, should_process)
+            for neighbor, condition in zip(neighbors.tolist(), should_process.tolist()):
+                queue.conditional_append(neighbor, condition)
+
+            key += real
+            remaining -= real
+
+        result_distance = distance.obliviousReadBatch(np.arange(self.V + 1))
+        result_parent = parent.obliviousReadBatch(np.arange(self.V + 1))
+        result_distance[0] = UNREACHED
+        return {
+            "distance": result_distance,
+            "parent": result_parent,
+            "iterations": self.iterations,
+            "seconds": time.perf_counter() - started,
+        }
+
+
+def compare_with_run_algorithm(algorithm, start_vertex, array_backend="linear", row_store="matrix", **array_options):
+    """
+    Run ObliviousBFS and GraphAlgorithm.run_algorithm (compaction never drops
+    a vertex) from the same start vertex and check that they reach the same
+    vertices, that the distances match a plain BFS and that every parent is
+    one level closer to the start.
+
+    Returns: dict with iteration counts and timings of both engines
+    """
+    result = ObliviousBFS(algorithm, array_backend, row_store, **array_options).run(start_vertex)
+    distance = result["distance"]
+    parent = result["parent"]
+
+    started = time.perf_counter()
+    compaction_del = len(algorithm.adjacency_matrix) * algorithm.d
+    algorithm.run_algorithm(start_vertex, 1, compaction_del, verbosity=graph_algorithm.SILENT)
+    run_seconds = time.perf_counter() - started
+
+    reached = distance[1:] != UNREACHED
+    if reached.tolist() != [bit == 1 for bit in algorithm.get_vertex_bits()]:
+        raise AssertionError("ObliviousBFS and run_algorithm reach different vertices")
+    levels = multi_source.MultiSourceTraversal(algorithm).run([start_vertex], return_levels=True)["levels"][0]
+    if not np.array_equal(distance[1:], levels):
+        raise AssertionError("ObliviousBFS distances differ from a plain BFS")
+    children = np.flatnonzero(reached) + 1
+    children = children[children != start_vertex]
+    if not np.array_equal(distance[parent[children]], distance[children] - 1):
+        raise AssertionError("ObliviousBFS parents are not one level closer to the start")
+
+    return {
+        "array_backend": array_backend,
+        "row_store": row_store,
+        "reached": int(reached.sum()),
+        "oblivious_iterations": result["iterations"],
+        "oblivious_seconds": result["seconds"],
+        "run_algorithm_iterations": algorithm.get_outer_loop_count(),
+        "run_algorithm_seconds": run_seconds,
+    }
+
+
+def project_run_time(V, sample_iterations=200, array_backend="linear", row_store="matrix"):
+    """
+    Time the first sample_iterations of an ObliviousBFS run and scale to the
+    full fixed schedule; the cost of an iteration does not depend on the graph
+    beyond (V, d).
+
+    Returns: dict with V, seconds per iteration and projected seconds
+    """
+    edges = graph_algorithm.generate_large_test_case(V, 2 * V)
+    engine = ObliviousBFS(graph_algorithm.GraphAlgorithm(edges, V, len(edges)), array_backend, row_store)
+    iterations = engine.iterations
+    engine.iterations = sample_iterations
+    seconds = engine.run(1)["seconds"] / sample_iterations
+    return {"V": V, "iteration_seconds": seconds, "projected_seconds": seconds * iterations}
+
+
+def main():
+    configurations = [
+        (1000, "linear", "matrix"),
+        (1000, "linear", "okvs"),
+        (200, "path_oram", "matrix"),
+    ]
+    results = []
+    for V, array_backend, row_store in configurations:
+        edges = graph_algorithm.generate_large_test_case(V, 2 * V)
+        algorithm = graph_algorithm.GraphAlgorithm(edges, V, len(edges))
+        results.append((V, algorithm.d, compare_with_run_algorithm(algorithm, 1, array_backend, row_store)))
+
+    print("\nObliviousBFS vs run_algorithm (distances checked against a plain BFS)\n")
+    print(f"{'V':>6} {'d':>3} {'arrays':>10} {'rows':>7} {'reached':>8} {'obl iters':>10} {'obl (s)':>9} "
+          f"{'run iters':>10} {'run (s)':>9}")
+    for V, d, result in results:
+        print(f"{V:>6} {d:>3} {result['array_backend']:>10} {result['row_store']:>7} {result['reached']:>8} "
+              f"{result['oblivious_iterations']:>10} {result['oblivious_seconds']:>9.3f} "
+              f"{result['run_algorithm_iterations']:>10} {result['run_algorithm_seconds']:>9.3f}")
+
+    projections = [project_run_time(V) for V in [1000, 10_000, 100_000]]
+    print("\nLinear-scan ObliviousBFS, projected from 200 iterations\n")
+    print(f"{'V':>8} {'ms/iteration':>13} {'projected (s)':>14}")
+    for projection in projections:
+        print(f"{projection['V']:>8} {projection['iteration_seconds'] * 1000:>13.3f} "
+              f"{projection['projected_seconds']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
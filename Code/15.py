@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+
+BLOCK = 1 << 13  # Entries matched per step in batched sweeps; keeps temporaries in cache
+
+_positions_cache = np.arange(0)
+
+
+def _positions(n):
+    """0 .. n - 1, shared between calls"""
+    global _positions_cache
+    if len(_positions_cache) < n:
+        _positions_cache = np.arange(max(n, 2 * len(_positions_cache)))
+    return _positions_cache[:n]
+
+
+def oblivious_select(array, index):
+    """
+    Masked select: read every entry (or row) of array and keep only array[index].
+    Returns a scalar for 1-D arrays and a row for 2-D arrays.
+    """
+    mask = _positions(len(array)) == index
+    if array.ndim == 1:
+        return np.where(mask, array, 0).sum().item()
+    return mask.astype(array.dtype) @ array  # One multiply-add per entry, far cheaper than a 2-D where
+
+
+def _sweep_slots(sorted_indices, begin, length):
+    """
+    Match positions begin .. begin + length - 1 against k sorted indices.
+    Only the k-entry index table is searched; the big array is never indexed.
+
+    Returns: slot of each position in sorted_indices and whether it is a hit
+    """
+    positions = _positions(begin + length)[begin:]
+    slots = np.searchsorted(sorted_indices, positions)
+    np.minimum(slots, len(sorted_indices) - 1, out=slots)
+    return slots, sorted_indices[slots] == positions
+
+
+def oblivious_select_batch(array, indices, block=BLOCK):
+    """
+    k reads in one sweep: every entry of array is read once and matched
+    against the sorted lookup indices, so the cost is O(n log k) rather than
+    O(n * k) for k separate selects.
+
+    Returns: array of k values (k x width for 2-D arrays)
+    """
+    indices = np.asarray(indices)
+    unique, inverse = np.unique(indices, return_inverse=True)
+    found = np.zeros((len(unique),) + array.shape[1:], dtype=array.dtype)
+    if len(unique) == 0:
+        return found
+    for begin in range(0, len(array), block):
+        chunk = array[begin:begin + block]
+        slots, hit = _sweep_slots(unique, begin, len(chunk))
+        found[slots[hit]] = chunk[hit]
+    return found[inverse]
+
+
+def oblivious_write(array, index, value, condition=True):
+    """Conditional write in place; every entry is rewritten whether or not condition holds"""
+    array[...] = np.where((_positions(len(array)) == index) & bool(condition), value, array)
+
+
+def oblivious_write_batch(array, indices, values, conditions=None, block=BLOCK):
+    """
+    k conditional writes in one sweep, in place; every entry is rewritten.
+    When several writes hit the same index the last one whose condition holds
+    wins, as if they were applied in order.
+    """
+    indices = np.asarray(indices)
+    values = np.broadcast_to(np.asarray(values, dtype=array.dtype), indices.shape + array.shape[1:])
+    conditions = np.ones(len(indices), dtype=bool) if conditions is None else np.asarray(conditions, dtype=bool)
+
+    # Resolve the k writes to one value per written index (k-sized work)
+    unique, inverse = np.unique(indices[conditions], return_inverse=True)
+    last = np.zeros(len(unique), dtype=np.int64)
+    # Position of the latest write per index; np.maximum.at is defined for repeated
+    # indices, unlike plain fancy-index assignment
+    np.maximum.at(last, inverse, np.flatnonzero(conditions))
+    new_values = values[last]
+
+    for begin in range(0, len(array), block):
+        chunk = array[begin:begin + block]
+        if len(unique) == 0:
+            chunk[...] = chunk
+            continue
+        slots, hit = _sweep_slots(unique, begin, len(chunk))
+        if array.ndim == 1:
+            chunk[...] = np.where(hit, new_values[slots], chunk)
+        else:
+            chunk[...] = np.where(hit[:, None], new_values[slots], chunk)
+
+
+def oblivious_swap(condition, a, b):
+    """Conditional swap of two equal-shape arrays in place; condition may be a scalar or elementwise"""
+    condition = np.asarray(condition, dtype=bool)
+    a_values = a.copy()
+    a[...] = np.where(condition, b, a)
+    b[...] = np.where(condition, a_values, b)
+
+
+def _loop_select(array, index):
+    """obliviousGet from 5.py as a per-element Python loop"""
+    result = 0
+    for position, value in enumerate(array.tolist()):
+        if position == index:
+            result = value
+    return result
+
+
+def benchmark_primitives(sizes, k=8, repeats=3, seed=42):
+    """
+    Time k lookups as a per-element loop, k single vectorized selects and one
+    batched select.
+
+    Returns: list of dicts with size and best seconds per method
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        array = rng.integers(0, 1 << 30, size)
+        indices = rng.integers(0, size, k)
+        methods = {
+            "loop": lambda: [_loop_select(array, i) for i in indices.tolist()],
+            "select": lambda: [oblivious_select(array, i) for i in indices.tolist()],
+            "batch": lambda: oblivious_select_batch(array, indices).tolist(),
+        }
+        result = {"size": size}
+        for name, method in methods.items():
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                values = method()
+                best = min(best, time.perf_counter() - start)
+            if values != array[indices].tolist():
+                raise AssertionError(f"{name} returned wrong values at size {size}")
+            result[name] = best
+        results.append(result)
+    return results
+
+
+def main():
+    for k in [8, 64]:
+        print(f"Time for {k} oblivious reads (ms)\n")
+        print(f"{'size':>10} {'loop':>10} {'select':>10} {'batch':>10} {'loop/batch':>11}")
+        for result in benchmark_primitives([1000, 10_000, 100_000, 1_000_000], k=k):
+            print(f"{result['size']:>10} {result['loop'] * 1000:>10.3f} {result['select'] * 1000:>10.3f} "
+                  f"{result['batch'] * 1000:>10.3f} {result['loop'] / result['batch']:>11.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import numpy as np
+
+from siblings import load_script
+
+solver = load_script(1)  # Convergence bound: compactions until all vertices are seen
+cost_surface = load_script(6)  # d and the seen-minus-processed expression
+cost_model = load_script(7)  # Real entries per window: ((1 + delta_min) * d * n) / 4
+graph_algorithm = load_script(3)  # GraphAlgorithm and test graph generator
+
+N_BLOCK = 512  # Candidate n values per block when evaluating the 6.py expression
+N_CANDIDATES = 4999  # Every n up to this many; geometrically spaced values beyond
+
+
+def _levels(m):
+    return np.ceil(np.log2(np.maximum(m, 2)))
+
+
+# Compare-exchanges of one compaction of m entries, for the engines of 8.py
+COMPACTION_COSTS = {
+    "partition": lambda m: m,
+    "goodrich": lambda m: m * _levels(m),
+    "bitonic": lambda m: 2 ** _levels(m) / 2 * _levels(m) * (_levels(m) + 1) / 2,
+}
+
+
+def _backlog_bound(V, E, n, windows):
+    """
+    Largest value of the 6.py expression v * (a / v)^(y - 1) - y * n over the
+    window boundaries y = 2 .. windows[i] of each candidate n[i], clipped to
+    [0, V]. y = 1 is left out: it is V - n, the unseen vertices before the
+    first window, not a backlog carried through a compaction. Where the
+    expression overflows the bound falls back to V.
+    """
+    backlog = np.empty(len(n))
+    for begin in range(0, len(n), N_BLOCK):
+        block_n = n[begin:begin + N_BLOCK]
+        block_windows = windows[begin:begin + N_BLOCK]
+        y = np.arange(2, max(2, block_windows.max()) + 1)[:, None]
+        x = cost_surface.calculate_expression(V, E, y, block_n[None, :])
+        overflow = np.isnan(x).any(axis=0)
+        x = np.where(y <= np.maximum(block_windows, 2), x, -np.inf)
+        backlog[begin:begin + N_BLOCK] = np.where(overflow, V, np.nanmax(x, axis=0))
+    return np.clip(backlog, 0, V)
+
+
+def _simulate_iterations(V, E, n, d, compaction_del, max_windows, rows=None):
+    """
+    Expected iterations of run_algorithm for every candidate n[i], following
+    the queue one n-iteration window at a time. A vertex takes r = rows / V
+    iterations, one per matrix row (rows defaults to V: one row per vertex,
+    the usual case since d = ceil(2E/V) + 1 exceeds the average degree), and
+    popping a dummy takes one:
+    - compaction moves the `backlog` seen-but-unprocessed vertices to the front,
+      followed by dummies up to the queue length, so a window first processes
+      min(n / r, backlog) vertices and only then reaches entries appended
+      during it, of which a fraction q = g / (r * d) is real;
+    - each processed vertex reveals g = max(1, (2E/V) * unseen / V) new vertices;
+      the floor of one stands for the connectivity of the test graphs, which
+      keeps the frontier from dying out before every vertex is seen.
+
+    Returns: (iterations, carry) arrays; iterations is inf where the run does
+    not finish within max_windows, carry is the largest seen-but-unprocessed
+    backlog at a window boundary, i.e. the real entries a compaction must keep
+    """
+    branching = 2 * E / V
+    r = (rows or V) / V
+    n = n.astype(np.float64)
+    seen = np.ones_like(n)
+    processed = np.zeros_like(n)
+    length = np.ones_like(n)
+    iterations = np.zeros_like(n)
+    carry = np.zeros_like(n)
+    done = np.zeros(len(n), dtype=bool)
+    for _ in range(max_windows):
+        backlog = seen - processed
+        front = np.minimum(n / r, backlog)
+        padding = length - backlog
+        revealed = np.maximum(branching * (V - seen) / V, 1)
+        # A fresh entry costs one iteration as a dummy and r as a real vertex
+        q = np.clip(revealed / (r * d), 0, 1)
+        fresh = np.minimum(q * np.maximum(0, n - front * r - padding) / (1 - q + q * r), front * revealed)
+        window = front + fresh
+        seen_next = np.minimum(V, np.maximum(seen + window * revealed, processed + window + 1))
+        processed = np.minimum(V, processed + window)
+        finished = ~done & (processed >= V - 0.5)
+        # The last window stops as soon as the final vertex is processed
+        iterations += np.where(done, 0, np.where(finished, np.minimum(n, window * r + np.minimum(padding, n - front * r)), n))
+        length = np.minimum(np.maximum(length - n, 0) + n * d, compaction_del)
+        seen = seen_next
+        carry = np.where(done, carry, np.maximum(carry, seen - processed))
+        done |= finished
+        if done.all():
+            break
+    return np.where(done, iterations, np.inf), carry
+
+
+def plan(V, E, epsilon=1e-6, p=0.25, compaction_engine="goodrich", max_k=1000, max_n=None, d=None, rows=None):
+    """
+    Pick n (iterations between compactions) and compaction_del for a graph
+    with V vertices and E edges, whose matrix has rows of d neighbors
+    (default ceil(2E/V) + 1) and `rows` used matrix rows (default V, one per
+    vertex). For another d_strategy pass algorithm.d and
+    int(algorithm.row_count.sum()): with d below the largest degree vertices
+    span several rows, which takes more iterations and fills rows denser.
+
+    Candidates are every n up to max_n (default V), or N_CANDIDATES
+    geometrically spaced values when max_n is larger. For every candidate n:
+    - 1.py gives the number of n-iteration windows k(n) until all but
+      epsilon * V vertices are seen; candidates needing more than max_k are out.
+    - 7.py bounds the real entries one window adds, ((1 + delta_min) * d * n) / 4,
+      scaled up when E / (rows * d) says more than a quarter of the slots are real.
+      The seen-but-unprocessed backlog a compaction has to keep is the larger
+      of the 6.py expression at the window boundaries y >= 2 and the carry
+      of _simulate_iterations. compaction_del covers backlog plus one window,
+      capped at V because a vertex is enqueued at most once.
+    - The predicted iteration count follows the queue window by window
+      (_simulate_iterations): large n wastes the tail of each window on
+      dummies, small n pays for many compactions.
+    - Predicted work is d slots per iteration plus the compare-exchanges of
+      every compaction of compaction_del + n * d entries with compaction_engine.
+
+    When no candidate sees all vertices within max_k windows, or E < V (a
+    forest at best, where the expanding-graph model underestimates the
+    backlog), the plan falls back to the safe compaction_del = V
+    with n = V // d, predicting one iteration per matrix row; its `fallback`
+    entry is True.
+
+    Returns: dict with the minimum-work configuration; pass it to
+    GraphAlgorithm.run_algorithm(start_vertex, plan=...)
+    """
+    if compaction_engine not in COMPACTION_COSTS:
+        raise ValueError(f"Unknown compaction engine {compaction_engine!r}, choose from {sorted(COMPACTION_COSTS)}")
+    d = d or cost_surface.calculate_d(E, V)
+    max_n = max_n or max(1, V)
+
+    if max_n <= N_CANDIDATES:
+        n = np.arange(1, max_n + 1)
+    else:
+        n = np.unique(np.round(np.geomspace(1, max_n, N_CANDIDATES)).astype(np.int64))
+    windows = solver.compactions_needed(n, V, d, p, epsilon)
+    n = n[windows <= max_k]
+    windows = windows[windows <= max_k]
+
+    # 7.py assumes a quarter of the slots of a row are real; rows filled denser than that add more per window
+    fill_scale = max(1.0, 4 * E / (rows * d)) if rows else 1.0
+    window_bound = cost_model.calculate_cost(n, d) * fill_scale
+    # Without truncation first, to find the backlog compaction has to keep
+    _, carry = _simulate_iterations(V, E, n, d, np.full(len(n), V), max_k, rows)
+    backlog_bound = np.clip(np.maximum(_backlog_bound(V, E, n, windows), carry), 0, V)
+    compaction_del = np.clip(np.ceil(backlog_bound + window_bound), 1, V).astype(np.int64)
+
+    iterations, _ = _simulate_iterations(V, E, n, d, compaction_del, max_k, rows)
+    n, windows, window_bound, backlog_bound, compaction_del, iterations = (
+        x[np.isfinite(iterations)] for x in (n, windows, window_bound, backlog_bound, compaction_del, iterations))
+    fallback = len(n) == 0 or E < V
+    if fallback:
+        n = np.array([max(1, min(max_n, V // d))])
+        window_bound = cost_model.calculate_cost(n, d)
+        backlog_bound = np.array([float(V)])
+        compaction_del = np.array([V])
+        iterations = np.array([2 * V])
+    iterations = np.ceil(iterations).astype(np.int64)
+    compactions = -(-iterations // n)
+    queue_capacity = compaction_del + n * d
+    work = iterations * d + compactions * COMPACTION_COSTS[compaction_engine](queue_capacity)
+
+    best = int(np.argmin(work))
+    return {
+        "V": V,
+        "E": E,
+        "d": d,
+        "epsilon": epsilon,
+        "n": int(n[best]),
+        "compaction_del": int(compaction_del[best]),
+        "compaction_engine": compaction_engine,
+        "queue_capacity": int(queue_capacity[best]),
+        "window_bound": float(window_bound[best]),
+        "backlog_bound": float(backlog_bound[best]),
+        "predicted_iterations": int(iterations[best]),
+        "predicted_compactions": int(compactions[best]),
+        "predicted_work": float(work[best]),
+        "fallback": fallback,
+    }
+
+
+def main():
+    rows = []
+    for family, V, target_E, d_strategy in [("uniform", 1000, 1500, "ceil_2e_over_v"),
+                                            ("uniform", 2000, 6000, "ceil_2e_over_v"),
+                                            ("power_law", 2000, 6000, "ceil_2e_over_v"),
+                                            ("grid", 2500, 5000, "ceil_2e_over_v"),
+                                            ("uniform", 1000, 1500, "min_cells")]:
+        edges = graph_algorithm.generate_large_test_case(V, target_E, family=family)
+        algorithm = graph_algorithm.GraphAlgorithm(edges, V, len(edges), d_strategy=d_strategy)
+        if d_strategy == "ceil_2e_over_v":
+            configuration = plan(V, len(edges))
+        else:
+            configuration = plan(V, len(edges), d=algorithm.d, rows=int(algorithm.row_count.sum()))
+
+        algorithm.run_algorithm(1, verbosity=graph_algorithm.SILENT, plan=configuration)
+        dropped = algorithm.get_dropped_vertex_count()
+        iterations = algorithm.get_outer_loop_count()
+        # The values main() of 3.py used before the planner existed
+        algorithm.run_algorithm(1, 10, 100, verbosity=graph_algorithm.SILENT)
+        rows.append((family, V, len(edges), configuration, iterations, dropped, algorithm.get_dropped_vertex_count()))
+
+    print(f"\n{'family':>10} {'V':>6} {'E':>6} {'d':>3} {'n':>5} {'del':>6} {'pred iters':>10} {'iters':>7} "
+          f"{'dropped':>8} {'fixed dropped':>14}")
+    for family, V, E, configuration, iterations, dropped, fixed_dropped in rows:
+        print(f"{family:>10} {V:>6} {E:>6} {configuration['d']:>3} {configuration['n']:>5} "
+              f"{configuration['compaction_del']:>6} {configuration['predicted_iterations']:>10} {iterations:>7} "
+              f"{dropped:>8} {fixed_dropped:>14}")
+    print("\n'fixed dropped': vertices dropped with the old hard-coded n = 10, compaction_del = 100")
+
+
+if __name__ == "__main__":
+    main()
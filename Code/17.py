@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm and test graph generator
+planner = load_script(16)  # n and compaction_del for each graph
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench")
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+DENSITIES = (1.5, 4.0, 16.0)  # Edges per vertex
+MAX_TRAVERSAL_V = 10 ** 6  # run_algorithm is skipped above this V
+PHASES = ("vertex_row_mapping", "adjacency_matrix", "save_graph", "load_graph", "run_algorithm", "compact_queue")
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process; ru_maxrss is in KiB on Linux and bytes on macOS"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def _best_time(function, repeat, setup=None):
+    """Smallest wall time of repeat calls; setup() runs untimed before every call"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _fill_queue(algorithm, queue, rng, real_fraction=0.25):
+    """Fill a drained queue to capacity with vertices, of which about real_fraction are real"""
+    queue.compact(0)
+    algorithm.vertex_bits[:] = [0] + rng.choice(2, algorithm.V, p=[real_fraction, 1 - real_fraction]).tolist()
+    for x in rng.integers(0, algorithm.V + 1, queue.entries.capacity).tolist():
+        queue.append(x)
+
+
+def benchmark_case(V, density, family="uniform", repeat=3, traverse=True, seed=42):
+    """
+    Time the phases of one graph separately: CSR row mapping, adjacency matrix
+    build (which includes the mapping), saving the graph and memory-mapping it
+    back, a planned run_algorithm from vertex 1 and _compact_queue on a full
+    queue of the planned capacity.
+
+    Returns: dict with per-phase seconds and the peak RSS after each phase
+    """
+    with contextlib.redirect_stdout(io.StringIO()):  # The generator reports on stdout
+        start = time.perf_counter()
+        edges = np.asarray(graph_algorithm.generate_large_test_case(V, int(V * density), family=family, seed=seed))
+        generate_seconds = time.perf_counter() - start
+    E = len(edges)
+    algorithm = graph_algorithm.GraphAlgorithm.__new__(graph_algorithm.GraphAlgorithm)
+    algorithm._init_state(V, E)
+    degrees = np.bincount(edges[:, 0], minlength=V + 1)[1:]
+    phases = {}
+
+    seconds = _best_time(lambda: algorithm._create_vertex_row_mapping(degrees), repeat)
+    phases["vertex_row_mapping"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}
+
+    seconds = _best_time(lambda edges=edges: algorithm._create_adjacency_matrix(lambda: [edges], degrees), repeat)
+    phases["adjacency_matrix"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}
+    del edges
+
+    with tempfile.TemporaryDirectory() as directory:
+        seconds = _best_time(lambda: algorithm.save(directory), repeat)
+        phases["save_graph"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}
+        seconds = _best_time(lambda: graph_algorithm.GraphAlgorithm.load(directory), repeat)
+        phases["load_graph"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}
+
+    configuration = planner.plan(V, E)
+    iterations = None
+    if traverse:
+        # One run: the traversal dominates the case and its time hardly varies
+        seconds = _best_time(lambda: algorithm.run_algorithm(1, verbosity=graph_algorithm.SILENT,
+                                                             plan=configuration), 1)
+        iterations = algorithm.get_outer_loop_count()
+        phases["run_algorithm"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(),
+                                   "iterations": iterations, "iterations_per_second": iterations / seconds}
+
+    rng = np.random.default_rng(seed)
+    queue = graph_algorithm.CountingQueue(algorithm.vertex_bits, configuration["queue_capacity"])
+    seconds = _best_time(lambda: algorithm._compact_queue(queue, configuration["compaction_del"], trace=False,
+                                                          engine=configuration["compaction_engine"]),
+                         repeat, setup=lambda: _fill_queue(algorithm, queue, rng))
+    phases["compact_queue"] = {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(),
+                               "queue_length": configuration["queue_capacity"]}
+
+    return {
+        "V": V,
+        "E": E,
+        "density": density,
+        "family": family,
+        "d": algorithm.d,
+        "n": configuration["n"],
+        "compaction_del": configuration["compaction_del"],
+        "compaction_engine": configuration["compaction_engine"],
+        "generate_seconds": generate_seconds,
+        "phases": phases,
+    }
+
+
+def _run_case(arguments):
+    return benchmark_case(*arguments)
+
+
+def run_suite(sizes=SIZES, densities=DENSITIES, family="uniform", repeat=3, max_traversal_v=MAX_TRAVERSAL_V,
+              report=print):
+    """
+    Benchmark every (V, density) case, each in a fresh process so its peak RSS
+    is not inflated by the cases before it.
+
+    Returns: JSON-ready dict with environment metadata and one entry per case
+    """
+    cases = []
+    context = multiprocessing.get_context("spawn")
+    for V in sizes:
+        for density in densities:
+            with context.Pool(1) as pool:
+                case = pool.apply(_run_case, ((V, density, family, repeat, V <= max_traversal_v),))
+            cases.append(case)
+            if report is not None:
+                report(_format_case(case))
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def _case_key(case):
+    return case["family"], case["V"], case["density"]
+
+
+def compare(current, baseline, threshold=0.25, min_seconds=1e-3):
+    """
+    Compare per-phase wall times against a baseline run; a phase regresses when
+    it is more than threshold (relative) slower. Phases faster than min_seconds
+    in the baseline are reported but never flagged, as timer noise dominates
+    them. Cases or phases missing from either side are skipped.
+
+    Returns: list of (case key, phase, baseline seconds, current seconds, ratio, regressed)
+    """
+    baseline_cases = {_case_key(case): case for case in baseline["cases"]}
+    rows = []
+    for case in current["cases"]:
+        reference = baseline_cases.get(_case_key(case))
+        if reference is None:
+            continue
+        for phase in PHASES:
+            if phase not in case["phases"] or phase not in reference["phases"]:
+                continue
+            before = reference["phases"][phase]["seconds"]
+            after = case["phases"][phase]["seconds"]
+            ratio = after / before if before > 0 else float("inf")
+            rows.append((_case_key(case), phase, before, after, ratio, ratio > 1 + threshold and before >= min_seconds))
+    return rows
+
+
+def _format_case(case):
+    phases = case["phases"]
+    cells = [f"{case['family']:>8} {case['V']:>8} {case['density']:>5g} {case['E']:>9} {case['d']:>3}"]
+    for phase in PHASES:
+        cells.append(f"{phases[phase]['seconds']:>10.4f}" if phase in phases else f"{'-':>10}")
+    traversal = phases.get("run_algorithm")
+    cells.append(f"{traversal['iterations_per_second']:>10.0f}" if traversal else f"{'-':>10}")
+    cells.append(f"{max(phase['peak_rss_mb'] for phase in phases.values()):>8.1f}")
+    return " ".join(cells)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark matrix build, row mapping, traversal and compaction.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="vertex counts V")
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DENSITIES), help="edges per vertex")
+    parser.add_argument("--family", default="uniform", choices=graph_algorithm.GRAPH_FAMILIES)
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per phase; the fastest counts")
+    parser.add_argument("--max-traversal-v", type=int, default=MAX_TRAVERSAL_V,
+                        help="skip run_algorithm above this V")
+    parser.add_argument("--quick", action="store_true", help="only V = 10^3 and 10^4")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "latest.json"), help="results JSON")
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"), help="baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown that counts as a regression (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes if size <= 10 ** 4] if args.quick else args.sizes
+    print(f"{'family':>8} {'V':>8} {'E/V':>5} {'E':>9} {'d':>3} {'mapping':>10} {'matrix':>10} {'save':>10} "
+          f"{'load':>10} {'traversal':>10} {'compact':>10} {'iters/s':>10} {'RSS MB':>8}")
+    results = run_suite(sizes, args.densities, args.family, args.repeat, args.max_traversal_v)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nComparison with {args.baseline} (threshold +{args.threshold:.0%}):")
+    print(f"{'family':>8} {'V':>8} {'E/V':>5} {'phase':>20} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for (family, V, density), phase, before, after, ratio, regressed in rows:
+        flag = "  <- regression" if regressed else ""
+        print(f"{family:>8} {V:>8} {density:>5g} {phase:>20} {before:>10.4f} {after:>10.4f} {ratio:>7.2f}{flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"\n{regressions} regression(s) in {len(rows)} compared phases")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import time
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm and test graph generator
+compaction = load_script(8)  # Bitonic sorting network
+oblivious_bfs = load_script(14)  # DUMMY_VERTEX / UNREACHED conventions
+multi_source = load_script(11)  # Batched BFS, used as the distance reference
+planner = load_script(16)  # run_algorithm configuration for the comparison
+
+
+def _numpy_sort(keys):
+    return np.sort(keys), 0, 0
+
+
+# Sorts for the gathered neighbor keys: the bitonic network has a fixed
+# compare-exchange schedule, np.sort is the fast non-oblivious reference
+SORT_ENGINES = {
+    "bitonic": compaction.bitonic_sort,
+    "numpy": _numpy_sort,
+}
+
+
+class LevelSynchronousBFS:
+    """
+    BFS that expands a whole frontier per round with a fixed sequence of
+    vectorized passes over the 2V x (d+1) matrix of a GraphAlgorithm:
+
+    1. mark the rows whose vertex marker is in the frontier;
+    2. gather all 2V * d neighbor slots, turning slots of unmarked rows into
+       dummies;
+    3. sort the slots by (neighbor, parent) key, dummies last, with the
+       chosen sort engine;
+    4. scan the sorted keys: the first slot of every neighbor that is not yet
+       visited becomes a new frontier vertex, with the smallest frontier
+       parent; its visited, distance and parent entries are written through a
+       full-size gather / scatter in which all other slots target vertex 0.
+
+    Every round touches every row and slot, whatever the frontier; only the
+    number of rounds (eccentricity of the start vertex plus one) depends on
+    the graph, unless fixed_rounds runs exactly max_rounds.
+    """
+
+    def __init__(self, algorithm, sort_engine="bitonic"):
+        if sort_engine not in SORT_ENGINES:
+            raise ValueError(f"Unknown sort engine {sort_engine!r}, choose from {sorted(SORT_ENGINES)}")
+        self.algorithm = algorithm
+        self.V = algorithm.V
+        self.sort = SORT_ENGINES[sort_engine]
+        self.markers = algorithm.adjacency_matrix[:, 0].astype(np.int64)
+        self.neighbors = algorithm.adjacency_matrix[:, 1:].astype(np.int64)
+        # Key of a (neighbor, parent) slot; dummies get the largest key
+        self.key_base = self.V + 1
+        self.dummy_key = self.key_base * self.key_base
+
+    def _round(self, frontier, visited, distance, parent, level):
+        """One frontier expansion; returns the next frontier"""
+        # 1. Mark frontier rows (marker 0 rows read frontier[0], which is always False)
+        active = frontier[self.markers]
+        # 2. Gather neighbor slots of marked rows
+        slots = np.where(active[:, None], self.neighbors, oblivious_bfs.DUMMY_VERTEX).ravel()
+        sources = np.repeat(self.markers, self.neighbors.shape[1])
+        keys = np.where(slots != oblivious_bfs.DUMMY_VERTEX, slots * self.key_base + sources, self.dummy_key)
+        # 3. Sort, so all slots of a neighbor are adjacent and its smallest parent comes first
+        keys, _, _ = self.sort(keys)
+        # 4. Scan: first slot of each unvisited neighbor
+        targets = np.where(keys < self.dummy_key, keys // self.key_base, oblivious_bfs.DUMMY_VERTEX)
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = targets[1:] != targets[:-1]
+        new = first & (targets != oblivious_bfs.DUMMY_VERTEX) & ~visited[targets]
+
+        destination = np.where(new, targets, oblivious_bfs.DUMMY_VERTEX)
+        next_frontier = np.zeros(self.V + 1, dtype=bool)
+        next_frontier[destination] = new
+        visited[destination] = visited[destination] | new
+        distance[destination] = np.where(new, level, distance[destination])
+        parent[destination] = np.where(new, keys % self.key_base, parent[destination])
+        next_frontier[0] = False
+        visited[0] = False
+        distance[0] = oblivious_bfs.UNREACHED
+        parent[0] = 0
+        return next_frontier
+
+    def run(self, start_vertex, max_rounds=None, fixed_rounds=False):
+        """
+        Traverse from start_vertex, one frontier per round, until the frontier
+        is empty or max_rounds rounds ran. With fixed_rounds exactly
+        max_rounds rounds run (empty frontiers are processed too), so the
+        round count does not reveal the eccentricity.
+
+        Returns: dict with `distance` and `parent` (NumPy arrays indexed by
+        vertex id, index 0 unused; UNREACHED / 0 where not reached), `rounds`
+        and `seconds`
+        """
+        if fixed_rounds and max_rounds is None:
+            raise ValueError("fixed_rounds needs max_rounds")
+        started = time.perf_counter()
+        frontier = np.zeros(self.V + 1, dtype=bool)
+        frontier[start_vertex] = True
+        visited = frontier.copy()
+        distance = np.full(self.V + 1, oblivious_bfs.UNREACHED, dtype=np.int64)
+        distance[start_vertex] = 0
+        parent = np.zeros(self.V + 1, dtype=np.int64)
+
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            if not fixed_rounds and not frontier.any():
+                break
+            rounds += 1
+            frontier = self._round(frontier, visited, distance, parent, rounds)
+
+        return {
+            "distance": distance,
+            "parent": parent,
+            "rounds": rounds,
+            "seconds": time.perf_counter() - started,
+        }
+
+
+def check_against_bfs(algorithm, start_vertex, sort_engine="bitonic"):
+    """
+    Run LevelSynchronousBFS and check its distances against the batched BFS
+    of 11.py and that every parent is a frontier vertex one level closer that
+    has the child in one of its rows.
+
+    Returns: the run result
+    """
+    result = LevelSynchronousBFS(algorithm, sort_engine).run(start_vertex)
+    distance = result["distance"]
+    parent = result["parent"]
+    levels = multi_source.MultiSourceTraversal(algorithm).run([start_vertex], return_levels=True)["levels"][0]
+    if not np.array_equal(distance[1:], levels):
+        raise AssertionError("LevelSynchronousBFS distances differ from a plain BFS")
+    children = np.flatnonzero(distance[1:] > 0) + 1
+    if not np.array_equal(distance[parent[children]], distance[children] - 1):
+        raise AssertionError("LevelSynchronousBFS parents are not one level closer to the start")
+    for child in children.tolist():
+        start = algorithm.row_start[parent[child]]
+        if child not in algorithm.adjacency_matrix[start:start + algorithm.row_count[parent[child]], 1:]:
+            raise AssertionError(f"Parent {parent[child]} has no edge to {child}")
+    return result
+
+
+def main():
+    rng = np.random.default_rng(7)
+    checked = 0
+    for algorithm, start_vertex in graph_algorithm.random_multigraphs(rng, 30, 1, 80):
+        for sort_engine in SORT_ENGINES:
+            check_against_bfs(algorithm, start_vertex, sort_engine)
+            checked += 1
+
+    results = []
+    for V, target_E in [(1000, 3000), (10_000, 30_000), (100_000, 300_000)]:
+        edges = graph_algorithm.generate_large_test_case(V, target_E)
+        algorithm = graph_algorithm.GraphAlgorithm(edges, V, len(edges))
+        row = {"V": V, "E": len(edges), "d": algorithm.d}
+        for sort_engine in SORT_ENGINES:
+            result = check_against_bfs(algorithm, 1, sort_engine)
+            row["rounds"] = result["rounds"]
+            row[sort_engine] = result["seconds"]
+        started = time.perf_counter()
+        row["iterations"] = algorithm.run_algorithm(1, verbosity=graph_algorithm.SILENT,
+                                                    plan=planner.plan(V, len(edges)))
+        row["run_algorithm"] = time.perf_counter() - started
+        results.append(row)
+
+    print(f"\nDistances and parents matched a plain BFS on {checked} random multigraph runs\n")
+    print(f"{'V':>7} {'E':>7} {'d':>3} {'rounds':>7} {'bitonic (s)':>12} {'np.sort (s)':>12} "
+          f"{'run iters':>10} {'run (s)':>8}")
+    for row in results:
+        print(f"{row['V']:>7} {row['E']:>7} {row['d']:>3} {row['rounds']:>7} {row['bitonic']:>12.3f} "
+              f"{row['numpy']:>12.3f} {row['iterations']:>10} {row['run_algorithm']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
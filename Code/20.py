@@ -0,0 +1,378 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm, save / load and test graph generator
+compaction = load_script(8)  # Compaction engine names
+oblivious_queue = load_script(9)  # DUMMY convention and capacity of the in-memory queue
+planner = load_script(16)  # n and compaction_del for each graph
+
+BLOCK_BYTES = 1 << 16  # Size of one matrix or queue block read from / written to disk
+MEMORY_BUDGET = 1 << 24  # Bytes of matrix cache plus resident queue entries in run_external
+
+
+class BlockMatrix:
+    """
+    Read-only 2V x (d+1) matrix stored in an adjacency_matrix.npy file (as
+    written by GraphAlgorithm.save), read in blocks of block_rows rows with
+    explicit file reads. At most cache_blocks blocks stay in memory, evicted
+    least recently used first. Indexing with a row number returns that row, so
+    a BlockMatrix can stand in for the in-memory matrix of run_algorithm.
+    """
+
+    def __init__(self, path, block_rows, cache_blocks):
+        if block_rows < 1 or cache_blocks < 1:
+            raise ValueError("BlockMatrix needs at least one row per block and one cached block")
+        self.file = open(path, "rb")
+        version = np.lib.format.read_magic(self.file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(self.file)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(self.file)
+        else:
+            raise ValueError(f"Unsupported .npy version {version} in {path}")
+        if fortran_order or len(shape) != 2:
+            raise ValueError(f"{path} does not hold a C-ordered matrix")
+        self.offset = self.file.tell()  # Byte offset of row 0
+        self.shape = shape
+        self.dtype = dtype
+        self.row_bytes = shape[1] * dtype.itemsize
+        self.block_rows = block_rows
+        self.cache_blocks = cache_blocks
+        self.cache = OrderedDict()  # Block index -> rows, least recently used first
+        self.block_reads = 0  # Blocks read from the file
+        self.cache_hits = 0  # Row lookups served from the cache
+
+    @property
+    def nbytes(self):
+        """Largest memory footprint of the cache"""
+        return self.cache_blocks * self.block_rows * self.row_bytes
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _block(self, index):
+        block = self.cache.get(index)
+        if block is not None:
+            self.cache.move_to_end(index)
+            self.cache_hits += 1
+            return block
+        begin = index * self.block_rows
+        block = np.empty((min(self.block_rows, self.shape[0] - begin), self.shape[1]), dtype=self.dtype)
+        self.file.seek(self.offset + begin * self.row_bytes)
+        if self.file.readinto(block.reshape(-1).view(np.uint8)) != block.nbytes:
+            raise OSError(f"Short read of matrix block {index} from {self.file.name}")
+        self.block_reads += 1
+        self.cache[index] = block
+        if len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+        return block
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.shape[0]:
+            raise IndexError(f"Row {row} out of range for {self.shape[0]} rows")
+        return self._block(row // self.block_rows)[row % self.block_rows]
+
+    def close(self):
+        self.cache.clear()
+        self.file.close()
+
+
+class SpillingQueue:
+    """
+    FIFO with the interface of ObliviousQueue (9.py) that keeps at most
+    memory_entries entries in memory and spills the rest to a temporary file
+    in blocks of block_entries entries.
+
+    Entries are held as a front block being dequeued, a deque of full middle
+    blocks and a tail block being filled. Middle blocks stay in memory while
+    the budget allows (memory_entries minus the front and tail blocks); once it
+    is used up, every newly filled block is written to disk, and a spilled
+    block is read back when it reaches the front (or during compaction).
+    Spilled blocks are the ones queued last; each is written once and read
+    back at most once.
+    """
+
+    def __init__(self, capacity, memory_entries, block_entries=BLOCK_BYTES // 4, directory=None, dtype=np.int32):
+        if capacity < 1:
+            raise ValueError("SpillingQueue capacity must be at least 1")
+        if block_entries < 1 or memory_entries < 3 * block_entries:
+            raise ValueError("SpillingQueue needs memory for at least three blocks (front, tail and one middle)")
+        self.capacity = capacity
+        self.memory_entries = memory_entries
+        self.block_entries = block_entries
+        self.dtype = np.dtype(dtype)
+        self.max_resident_blocks = memory_entries // block_entries - 2  # Middle blocks kept in memory
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.free_slots = []  # Block slots of the spill file that can be reused
+        self.slots = 0  # Block slots allocated in the spill file
+        self.block_reads = 0  # Blocks read back from the spill file
+        self.block_writes = 0  # Blocks written to the spill file
+        self.peak_length = 0  # Largest length reached
+        self._reset()
+
+    def _reset(self):
+        self.front = np.zeros(0, dtype=self.dtype)
+        self.front_position = 0  # Index of the front entry in self.front
+        self.middle = deque()  # Full blocks: arrays in memory or slot numbers in the spill file
+        self.resident_blocks = 0  # Middle blocks in memory
+        self.tail = np.zeros(self.block_entries, dtype=self.dtype)
+        self.tail_length = 0
+        self.length = 0  # Number of entries in the queue
+
+    @property
+    def nbytes(self):
+        """Memory budget of the queue entries; spilled entries do not count"""
+        return self.memory_entries * self.dtype.itemsize
+
+    @property
+    def resident_entries(self):
+        """Entries currently held in memory, including the unused part of the tail block"""
+        return len(self.front) + (self.resident_blocks + 1) * self.block_entries
+
+    def __len__(self):
+        return self.length
+
+    def is_empty(self):
+        return self.length == 0
+
+    def _write_block(self, block):
+        slot = self.free_slots.pop() if self.free_slots else self.slots
+        self.slots = max(self.slots, slot + 1)
+        self.file.seek(slot * self.block_entries * self.dtype.itemsize)
+        self.file.write(block.tobytes())
+        self.block_writes += 1
+        return slot
+
+    def _read_block(self, slot, release=True):
+        block = np.empty(self.block_entries, dtype=self.dtype)
+        self.file.seek(slot * self.block_entries * self.dtype.itemsize)
+        if self.file.readinto(block.view(np.uint8)) != block.nbytes:
+            raise OSError(f"Short read of queue block {slot} from the spill file")
+        self.block_reads += 1
+        if release:
+            self.free_slots.append(slot)
+        return block
+
+    def _push_tail(self):
+        block = self.tail
+        self.tail = np.zeros(self.block_entries, dtype=self.dtype)
+        self.tail_length = 0
+        if self.resident_blocks < self.max_resident_blocks:
+            self.middle.append(block)
+            self.resident_blocks += 1
+        else:
+            self.middle.append(self._write_block(block))
+
+    def _advance_front(self):
+        if self.middle:
+            block = self.middle.popleft()
+            if isinstance(block, np.ndarray):
+                self.resident_blocks -= 1
+            else:
+                block = self._read_block(block)
+            self.front = block
+        else:
+            self.front = self.tail[:self.tail_length].copy()
+            self.tail_length = 0
+        self.front_position = 0
+
+    def enqueue(self, value):
+        self.conditional_enqueue_row([value])
+
+    def conditional_enqueue_row(self, row, mask=None):
+        """Enqueue a row; entries whose mask is False are written as dummies"""
+        values = np.asarray(row) if mask is None else np.where(mask, row, oblivious_queue.DUMMY)
+        if self.length + len(values) > self.capacity:
+            raise OverflowError(f"SpillingQueue is full ({self.capacity} entries)")
+        start = 0
+        while start < len(values):
+            take = min(self.block_entries - self.tail_length, len(values) - start)
+            self.tail[self.tail_length:self.tail_length + take] = values[start:start + take]
+            self.tail_length += take
+            start += take
+            if self.tail_length == self.block_entries:
+                self._push_tail()
+        self.length += len(values)
+        self.peak_length = max(self.peak_length, self.length)
+
+    def dequeue(self):
+        if self.length == 0:
+            raise IndexError("dequeue from an empty SpillingQueue")
+        if self.front_position == len(self.front):
+            self._advance_front()
+        value = self.front[self.front_position].item()
+        self.front_position += 1
+        self.length -= 1
+        return value
+
+    def _blocks(self, release=False):
+        """Queued entries block by block, front first; release=True empties the queue on the way"""
+        front = self.front[self.front_position:]
+        middle = self.middle
+        tail = self.tail[:self.tail_length].copy()
+        if release:
+            self._reset()
+        yield front
+        for index in range(len(middle)):
+            block = middle.popleft() if release else middle[index]
+            yield block if isinstance(block, np.ndarray) else self._read_block(block, release)
+        yield tail
+
+    def to_array(self):
+        """Copy of the queued entries, front first; reads every spilled block"""
+        return np.concatenate(list(self._blocks()))
+
+    def compact(self, compaction_del, engine="partition"):
+        """
+        Keep the first compaction_del entries of the real entries followed by
+        the dummies, the result of every engine in 8.py. The queue is streamed
+        block by block and rebuilt through the tail, so no more than a block
+        beyond the budget is resident; the engine only selects the name.
+
+        Returns: the dropped entries
+        """
+        if engine not in compaction.COMPACTION_ENGINES:
+            raise ValueError(f"Unknown compaction engine {engine!r}, "
+                             f"choose from {sorted(compaction.COMPACTION_ENGINES)}")
+        dropped = []
+        dummies = 0
+        for block in self._blocks(release=True):
+            real = block[block != oblivious_queue.DUMMY]
+            dummies += len(block) - len(real)
+            keep = min(len(real), compaction_del - self.length)
+            self.conditional_enqueue_row(real[:keep])
+            dropped.append(real[keep:])
+        kept_dummies = min(dummies, compaction_del - self.length)
+        for begin in range(0, kept_dummies, self.block_entries):
+            self.conditional_enqueue_row(np.zeros(min(self.block_entries, kept_dummies - begin), dtype=self.dtype))
+        dropped.append(np.zeros(dummies - kept_dummies, dtype=self.dtype))
+        return np.concatenate(dropped)
+
+    def close(self):
+        self.file.close()
+
+
+def run_external(path, start_vertex, memory_budget=MEMORY_BUDGET, block_bytes=BLOCK_BYTES, spill_dir=None,
+                 plan=None, n=None, compaction_del=None, **options):
+    """
+    run_algorithm on a graph saved with GraphAlgorithm.save, holding the
+    2V x (d+1) matrix and the queue in at most memory_budget bytes:
+    - the matrix is read from adjacency_matrix.npy in blocks of block_bytes
+      through a BlockMatrix LRU cache;
+    - the queue is a SpillingQueue with blocks of block_bytes in spill_dir
+      (default: the system temporary directory).
+    About half the budget (at least three blocks) goes to the queue, the rest
+    to the matrix cache. Per-vertex state (row offsets and cursors, vertex
+    and processed bits) is O(V) and stays in memory; it is not counted.
+    Other keyword arguments go to run_algorithm.
+
+    Returns: dict with the traversal result (outer_loop_count,
+    dropped_vertices, algorithm), the block counters (matrix_block_reads,
+    matrix_cache_hits, queue_block_writes, queue_block_reads), the resident
+    bytes of cache and queue, the matrix size in bytes and seconds
+    """
+    if memory_budget < 4 * block_bytes:
+        raise ValueError(f"memory_budget must cover at least four blocks of {block_bytes} bytes")
+    algorithm = graph_algorithm.GraphAlgorithm.load(path)
+    matrix_bytes = algorithm.adjacency_matrix.nbytes
+    row_bytes = algorithm.adjacency_matrix.strides[0]
+    itemsize = algorithm.adjacency_matrix.dtype.itemsize
+    queue_blocks = max(3, memory_budget // 2 // block_bytes)
+    block_rows = max(1, block_bytes // row_bytes)
+    cache_blocks = max(1, (memory_budget - queue_blocks * block_bytes) // (block_rows * row_bytes))
+    cache_blocks = min(cache_blocks, -(-len(algorithm.adjacency_matrix) // block_rows))
+    algorithm.adjacency_matrix = BlockMatrix(os.path.join(path, "adjacency_matrix.npy"), block_rows, cache_blocks)
+
+    queues = []
+
+    def queue_factory(capacity):
+        queue = SpillingQueue(capacity, queue_blocks * (block_bytes // itemsize), block_bytes // itemsize, spill_dir)
+        queues.append(queue)
+        return queue
+
+    options.setdefault("verbosity", graph_algorithm.SILENT)
+    started = time.perf_counter()
+    try:
+        algorithm.run_algorithm(start_vertex, n, compaction_del, plan=plan, queue_factory=queue_factory, **options)
+    finally:
+        algorithm.adjacency_matrix.close()
+        for queue in queues:
+            queue.close()
+    matrix = algorithm.adjacency_matrix
+    return {
+        "outer_loop_count": algorithm.get_outer_loop_count(),
+        "dropped_vertices": algorithm.get_dropped_vertex_count(),
+        "algorithm": algorithm,
+        "matrix_block_reads": matrix.block_reads,
+        "matrix_cache_hits": matrix.cache_hits,
+        "queue_block_writes": sum(queue.block_writes for queue in queues),
+        "queue_block_reads": sum(queue.block_reads for queue in queues),
+        "resident_bytes": matrix.nbytes + sum(queue.nbytes for queue in queues),
+        "matrix_bytes": matrix_bytes,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _same_run(external, reference):
+    return (external.get_processed_vertices() == reference.get_processed_vertices()
+            and external.get_outer_loop_count() == reference.get_outer_loop_count()
+            and external.get_dropped_vertex_count() == reference.get_dropped_vertex_count()
+            and external.get_max_queue_size() == reference.get_max_queue_size())
+
+
+def main():
+    rng = np.random.default_rng(5)
+    checked = 0
+    with tempfile.TemporaryDirectory() as directory:
+        # Tiny blocks and budgets, so every run evicts matrix blocks and spills queue blocks
+        for algorithm, start_vertex in graph_algorithm.random_multigraphs(rng, 40, 2, 300):
+            algorithm.save(directory)
+            n = int(rng.integers(1, 8))
+            compaction_del = int(rng.integers(1, 3 * algorithm.V))
+            engine = sorted(compaction.COMPACTION_ENGINES)[checked % len(compaction.COMPACTION_ENGINES)]
+            algorithm.run_algorithm(start_vertex, n, compaction_del, verbosity=graph_algorithm.SILENT,
+                                    compaction_engine=engine)
+            block_bytes = 16 * algorithm.adjacency_matrix.strides[0]
+            result = run_external(directory, start_vertex, 4 * block_bytes, block_bytes, n=n,
+                                  compaction_del=compaction_del, compaction_engine=engine)
+            assert _same_run(result["algorithm"], algorithm)
+            checked += 1
+
+        V, target_E = 100_000, 400_000
+        with contextlib.redirect_stdout(io.StringIO()):  # The generator reports on stdout
+            edges = graph_algorithm.generate_large_test_case(V, target_E)
+        algorithm = graph_algorithm.GraphAlgorithm(edges, V, len(edges))
+        configuration = planner.plan(V, len(edges))
+        started = time.perf_counter()
+        algorithm.run_algorithm(1, verbosity=graph_algorithm.SILENT, plan=configuration)
+        in_memory_seconds = time.perf_counter() - started
+        algorithm.save(directory)
+        queue_bytes = configuration["queue_capacity"] * 4
+        rows = []
+        for budget in (1 << 26, 1 << 22, 1 << 20, 1 << 18):
+            result = run_external(directory, 1, budget, plan=configuration)
+            rows.append((budget, result, _same_run(result["algorithm"], algorithm)))
+
+    print(f"\nExternal runs matched the in-memory run on {checked} random multigraphs\n")
+    print(f"V = {V}, E = {len(edges)}, d = {algorithm.d}: matrix {result['matrix_bytes'] / 2 ** 20:.1f} MiB, "
+          f"queue capacity {queue_bytes / 2 ** 20:.1f} MiB, blocks of {BLOCK_BYTES // 1024} KiB")
+    print(f"In memory: {algorithm.get_outer_loop_count()} iterations in {in_memory_seconds:.2f} s\n")
+    print(f"{'budget':>10} {'resident':>10} {'matrix reads':>13} {'cache hits':>11} {'queue writes':>13} "
+          f"{'queue reads':>12} {'time (s)':>9} {'same':>5}")
+    for budget, result, same in rows:
+        print(f"{budget / 2 ** 20:>6.2f} MiB {result['resident_bytes'] / 2 ** 20:>6.2f} MiB "
+              f"{result['matrix_block_reads']:>13} {result['matrix_cache_hits']:>11} "
+              f"{result['queue_block_writes']:>13} {result['queue_block_reads']:>12} {result['seconds']:>9.2f} "
+              f"{'yes' if same else 'no':>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import tempfile
+from collections import deque
+
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # GraphAlgorithm, run_algorithm and random_multigraphs
+
+
+def _scan_reference_run(algorithm, start_vertex, n, compaction_del):
+    """
+    The run_algorithm loop as it was before CountingQueue: a deque of entries,
+    list vertex bits, rows processed one neighbor at a time and the real
+    entries counted by scanning the whole queue, O(queue) per iteration.
+
+    Returns: dict with outer_loop_count, processed_vertices, max_queue_size
+    and max_real_queue_size
+    """
+    V = algorithm.V
+    matrix = algorithm.adjacency_matrix.tolist()
+    row_start = algorithm.row_start.tolist()
+    row_count = algorithm.row_count.tolist()
+    row_cursor = [0] * (V + 1)
+    vertex_bits = [0] * (V + 1)
+    processed = [start_vertex]
+    queue = deque()
+    max_queue_size = 0
+    max_real_queue_size = 0
+    outer_loop_count = 0
+    current_vertex = start_vertex
+    vertex_bits[current_vertex] = 1
+
+    while True:
+        outer_loop_count += 1
+        edges_added = False
+        if row_cursor[current_vertex] < row_count[current_vertex]:
+            row = matrix[row_start[current_vertex] + row_cursor[current_vertex]]
+            row_cursor[current_vertex] += 1
+            real_vertices_added = 0
+            for vertex in row[1:]:
+                if 1 <= vertex <= V and vertex_bits[vertex] == 0:
+                    vertex_bits[vertex] = 1
+                    queue.append(vertex)
+                    real_vertices_added += 1
+                else:
+                    queue.append(0)
+            if real_vertices_added:
+                real_in_queue = sum(1 for x in queue if x != 0 and 1 <= x <= V and vertex_bits[x] == 0)
+                max_real_queue_size = max(max_real_queue_size, real_in_queue + real_vertices_added)
+            edges_added = True
+
+        all_rows_done = row_cursor[current_vertex] == row_count[current_vertex]
+        if all_rows_done:
+            if current_vertex not in processed:
+                processed.append(current_vertex)
+            vertex_bits[current_vertex] = 1
+            if len(processed) == V:
+                break
+            if queue:
+                next_vertex = queue.popleft()
+                if next_vertex != 0:
+                    current_vertex = next_vertex
+            elif not edges_added:
+                break
+
+        real_queue_size = sum(1 for x in queue if x != 0 and 1 <= x <= V and vertex_bits[x] == 0)
+        max_queue_size = max(max_queue_size, len(queue))
+        max_real_queue_size = max(max_real_queue_size, real_queue_size)
+
+        if outer_loop_count % n == 0:
+            compacted = ([x for x in queue if x != 0] + [x for x in queue if x == 0])[:compaction_del]
+            queue = deque(compacted)
+
+        if len(queue) == 0 and all_rows_done:
+            break
+
+    return {
+        "outer_loop_count": outer_loop_count,
+        "processed_vertices": processed,
+        "max_queue_size": max_queue_size,
+        "max_real_queue_size": max_real_queue_size,
+    }
+
+
+def check_queue_counters(num_graphs=200, seed=0):
+    """
+    Run run_algorithm (live CountingQueue counters) and the scan-based
+    reference loop on random multigraphs and check that both report the same
+    maximum queue size, maximum real queue size, iteration count and
+    processing order.
+    """
+    rng = np.random.default_rng(seed)
+    for algorithm, start_vertex in graph_algorithm.random_multigraphs(rng, num_graphs, 1, 41):
+        n, compaction_del = int(rng.integers(1, 7)), int(rng.integers(1, 3 * algorithm.V + 1))
+        reference = _scan_reference_run(algorithm, start_vertex, n, compaction_del)
+        algorithm.run_algorithm(start_vertex, n, compaction_del, verbosity=graph_algorithm.SILENT)
+        counted = {
+            "outer_loop_count": algorithm.get_outer_loop_count(),
+            "processed_vertices": algorithm.get_processed_vertices(),
+            "max_queue_size": algorithm.get_max_queue_size(),
+            "max_real_queue_size": algorithm.get_max_real_queue_size(),
+        }
+        if counted != reference:
+            raise AssertionError(f"Counter path differs from the scan path on V = {algorithm.V}, E = {algorithm.E}, "
+                                 f"start = {start_vertex}, n = {n}, compaction_del = {compaction_del}: "
+                                 f"{counted} vs {reference}")
+    return num_graphs
+
+
+def _same_graph(a, b):
+    return ((a.V, a.E, a.d, a.d_strategy, a.d_selection, a.dummy_row_count)
+            == (b.V, b.E, b.d, b.d_strategy, b.d_selection, b.dummy_row_count)
+            and all(np.array_equal(getattr(a, name), getattr(b, name)) for name in graph_algorithm.GRAPH_ARRAYS))
+
+
+def check_save_round_trip(num_graphs=20, seed=0):
+    """
+    Save random multigraphs, load them (memory-mapped and in memory), save
+    each loaded graph back to the directory it was loaded from and load it
+    again; every copy must equal the built graph.
+    """
+    rng = np.random.default_rng(seed)
+    for index, (algorithm, _) in enumerate(graph_algorithm.random_multigraphs(rng, num_graphs, 1, 300)):
+        with tempfile.TemporaryDirectory() as directory:
+            algorithm.save(directory)
+            loaded = graph_algorithm.GraphAlgorithm.load(directory, mmap=index % 2 == 0)
+            loaded.save(directory)
+            for copy in (loaded, graph_algorithm.GraphAlgorithm.load(directory)):
+                if not _same_graph(copy, algorithm):
+                    raise AssertionError(f"Saving a loaded graph back to its directory changed it (V = {algorithm.V})")
+    return num_graphs
+
+
+def main():
+    checked = check_queue_counters()
+    print(f"Queue maxima matched the scan-based loop on {checked} random multigraphs")
+    checked = check_save_round_trip()
+    print(f"Saving loaded graphs back to their own directory kept {checked} random multigraphs intact")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,120 +1,571 @@
+import itertools
+import json
 import math
-import random
-from collections import deque
+import os
+import time
+
+import numpy as np
+
+from siblings import load_script
+
+compaction = load_script(8)  # Queue compaction engines
+oblivious_queue = load_script(9)  # Fixed-capacity ring buffer queue
+
+# On-disk layout of GraphAlgorithm.save / load: header.json plus one .npy file per array
+GRAPH_FORMAT = "d-normalized-graph"
+GRAPH_FORMAT_VERSION = 1
+GRAPH_ARRAYS = ("adjacency_matrix", "row_start", "row_count")
+
+# Verbosity levels for GraphAlgorithm.run_algorithm
+SILENT = 0  # No output and no formatting work on the hot path
+SUMMARY = 1  # Setup and final statistics only
+TRACE = 2  # Full per-iteration output
+VERBOSITY_LEVELS = {"silent": SILENT, "summary": SUMMARY, "trace": TRACE}
+
+# d_strategy values of GraphAlgorithm (here and in 4.py): closed forms of V and E,
+# or None for the degree-aware search of select_d
+D_STRATEGIES = {
+    "ceil_2e_over_v": lambda V, E: math.ceil(2 * E / V) + 1,  # Default of this script
+    "two_ceil_e_over_v": lambda V, E: 2 * math.ceil(E / V) + 1,  # Default of 4.py
+    "min_cells": None,
+}
+
+
+def _open_sink(sink):
+    """
+    Turn a telemetry sink into (emit, close) callables. Supported sinks:
+    a list (records are appended), a path (one JSON record per line),
+    a writable file object (JSON lines) or any callable taking a record dict.
+    """
+    if isinstance(sink, list):
+        return sink.append, lambda: None
+    if isinstance(sink, (str, os.PathLike)):
+        handle = open(sink, "w")
+        return (lambda record: handle.write(json.dumps(record) + "\n")), handle.close
+    if hasattr(sink, "write"):
+        return (lambda record: sink.write(json.dumps(record) + "\n")), sink.flush
+    if callable(sink):
+        return sink, lambda: None
+    raise TypeError(f"Unsupported telemetry sink: {sink!r}")
+
+
+def _iter_edge_chunks(path, binary, zero_based, chunk_edges):
+    """Yield (k, 2) int64 arrays of edges from a text or binary int32 edge file"""
+    if binary:
+        if os.path.getsize(path) == 0:
+            return
+        edges = np.memmap(path, dtype=np.int32, mode="r").reshape(-1, 2)
+        for start in range(0, len(edges), chunk_edges):
+            chunk = edges[start:start + chunk_edges].astype(np.int64)
+            yield chunk + 1 if zero_based else chunk
+        return
+
+    with open(path) as handle:
+        while True:
+            raw_lines = list(itertools.islice(handle, chunk_edges))
+            if not raw_lines:
+                return
+            lines = [line for line in raw_lines if line.strip() and not line.startswith("#")]
+            if lines:
+                chunk = np.loadtxt(lines, dtype=np.int64, usecols=(0, 1), ndmin=2)
+                yield chunk + 1 if zero_based else chunk
+
+
+def select_d(degrees, V, E, d_strategy="ceil_2e_over_v"):
+    """
+    Pick the row width d for out-degrees of vertices 1..V and report what it
+    costs. With d, a vertex takes max(1, ceil(degree / d)) rows and the matrix
+    has max(2V, rows) rows of d + 1 cells, all of which oblivious processing
+    touches. Rows and cells come from the degree histogram, so every candidate
+    is evaluated at once.
+
+    "min_cells" evaluates every d from 1 to the largest closed-form d and
+    picks the one with the fewest cells among those whose rows fit the 2V row
+    budget (d = ceil(E/V) always does); the other strategies use their closed
+    form.
+
+    Returns: dict with d, d_strategy, rows (used rows), matrix_rows, cells,
+    padding_ratio (share of neighbor slots that are zero padding) and
+    overflow_rows (rows beyond the first of each vertex)
+    """
+    if d_strategy not in D_STRATEGIES:
+        raise ValueError(f"Unknown d strategy {d_strategy!r}, choose from {sorted(D_STRATEGIES)}")
+    degree_values, vertex_counts = np.unique(np.asarray(degrees, dtype=np.int64), return_counts=True)
+
+    def rows_for(d):
+        return (np.maximum(1, -(-degree_values[None, :] // d[:, None])) * vertex_counts).sum(axis=1)
+
+    if D_STRATEGIES[d_strategy] is None:
+        candidates = np.arange(1, max(form(V, E) for form in D_STRATEGIES.values() if form is not None) + 1)
+        rows = rows_for(candidates)
+        cells = np.where(rows <= 2 * V, np.maximum(2 * V, rows) * (candidates + 1), np.iinfo(np.int64).max)
+        d = int(candidates[np.argmin(cells)])
+    else:
+        d = D_STRATEGIES[d_strategy](V, E)
+    rows = int(rows_for(np.array([d]))[0])
+    matrix_rows = max(2 * V, rows)
+    return {
+        "d": d,
+        "d_strategy": d_strategy,
+        "rows": rows,
+        "matrix_rows": matrix_rows,
+        "cells": matrix_rows * (d + 1),
+        "padding_ratio": 1 - int(np.dot(degree_values, vertex_counts)) / (matrix_rows * d) if matrix_rows else 0.0,
+        "overflow_rows": rows - V,
+    }
+
+
+class CountingQueue:
+    """FIFO of queued vertices (0 = dummy) with live real / dummy entry counters
+
+    Entries live in a fixed-capacity ObliviousQueue ring buffer (9.py), or in
+    the queue returned by queue_factory(capacity), e.g. the disk-spilling
+    queue of 20.py. A real entry is a vertex 1..V whose bit is still 0. The
+    counters are updated on enqueue, dequeue, bit flips and compaction, so
+    reading them is O(1) instead of a scan over the whole queue. vertex_bits is a NumPy bool array
+    shared with the run; whole rows and compactions update the counters with
+    array operations.
+    """
+
+    def __init__(self, vertex_bits, capacity, queue_factory=None):
+        self.entries = (queue_factory or oblivious_queue.ObliviousQueue)(capacity)
+        self.vertex_bits = vertex_bits  # Shared with the GraphAlgorithm run
+        self.V = len(vertex_bits) - 1
+        self.occurrences = np.zeros(len(vertex_bits), dtype=np.int64)  # Queued copies of each vertex
+        self.real_count = 0  # Entries with vertex bit 0
+        self.dummy_count = 0  # Entries equal to 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.to_array().tolist())
+
+    def _track(self, x, delta):
+        if x == 0:
+            self.dummy_count += delta
+        elif 1 <= x <= self.V:
+            self.occurrences[x] += delta
+            if not self.vertex_bits[x]:
+                self.real_count += delta
+
+    def _track_array(self, values, delta):
+        values = np.asarray(values)
+        self.dummy_count += delta * int(np.count_nonzero(values == 0))
+        vertices = values[(values >= 1) & (values <= self.V)]
+        np.add.at(self.occurrences, vertices, delta)
+        self.real_count += delta * int(np.count_nonzero(~self.vertex_bits[vertices]))
+
+    def append(self, x):
+        self.entries.enqueue(x)
+        self._track(x, 1)
+
+    def extend_row(self, row, mask=None):
+        """Enqueue a whole row with a single buffer write; entries outside mask become dummies"""
+        row = np.asarray(row)
+        if mask is not None:
+            row = np.where(mask, row, 0)
+        self.entries.conditional_enqueue_row(row)
+        self._track_array(row, 1)
+
+    def popleft(self):
+        x = self.entries.dequeue()
+        self._track(x, -1)
+        return x
+
+    def set_vertex_bit(self, vertex):
+        """Set the bit of a vertex to 1; its queued copies stop being real"""
+        if not self.vertex_bits[vertex]:
+            self.vertex_bits[vertex] = True
+            self.real_count -= int(self.occurrences[vertex])
+
+    def set_vertex_bits(self, vertices):
+        """set_vertex_bit for an array of distinct vertices whose bits are 0"""
+        self.vertex_bits[vertices] = True
+        self.real_count -= int(self.occurrences[vertices].sum())
+
+    def compact(self, compaction_del, engine="partition"):
+        """
+        Compact in place; counters forget the dropped entries.
+
+        Returns: number of non-dummy entries dropped
+        """
+        dropped = self.entries.compact(compaction_del, engine)
+        self._track_array(dropped, -1)
+        return int(np.count_nonzero(dropped))
+
+    def real_entries(self):
+        return [x for x in self if x != 0 and 1 <= x <= self.V and not self.vertex_bits[x]]
+
+
+class RunStats:
+    """Counters and timers of one run_algorithm(..., profile=True) call"""
+
+    def __init__(self):
+        self.iterations = 0  # Outer loop iterations
+        self.rows_processed = 0  # Matrix rows read and enqueued
+        self.dummy_rows = 0  # Processed rows without any neighbor (marker-only rows)
+        self.dummy_pops = 0  # Dequeued dummy entries ("Top element is dummy, doing nothing")
+        self.real_pops = 0  # Dequeued non-dummy entries
+        self.compactions = 0
+        self.compaction_elements_dropped = 0  # Queue entries (real or dummy) removed by compaction
+        self.compaction_vertices_dropped = 0  # Non-dummy entries removed by compaction
+        self.row_seconds = 0.0  # Row processing and enqueueing
+        self.compaction_seconds = 0.0
+        self.total_seconds = 0.0
+        self.queue_length_histogram = np.zeros(1, dtype=np.int64)  # Iterations ending at each queue length
+
+    @property
+    def other_seconds(self):
+        """Loop time outside row processing and compaction: dequeues and bookkeeping"""
+        return self.total_seconds - self.row_seconds - self.compaction_seconds
+
+    def as_dict(self):
+        stats = {name: value for name, value in vars(self).items() if name != "queue_length_histogram"}
+        stats["other_seconds"] = self.other_seconds
+        stats["queue_length_histogram"] = self.queue_length_histogram.tolist()
+        return stats
+
+    def __repr__(self):
+        return (f"RunStats(iterations={self.iterations}, rows_processed={self.rows_processed}, "
+                f"dummy_pops={self.dummy_pops}, compactions={self.compactions}, "
+                f"row_seconds={self.row_seconds:.4f}, compaction_seconds={self.compaction_seconds:.4f})")
+
 
 class GraphAlgorithm:
-    def __init__(self, edges, V, E):
-        self.edges = edges  # List of tuples (u, v)
+    def __init__(self, edges, V, E, keep_edges=False, d_strategy="ceil_2e_over_v"):
+        self._init_state(V, E, d_strategy)
+
+        # The edge list and adjacency lists are only kept when asked for; the matrix holds the graph
+        if keep_edges:
+            self.edges = edges
+            self.adj_list = {i: [] for i in range(1, V + 1)}
+            for u, v in edges:
+                self.adj_list[u].append(v)
+
+        edge_array = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self._create_adjacency_matrix(lambda: [edge_array])
+
+    def _init_state(self, V, E, d_strategy="ceil_2e_over_v"):
+        if d_strategy not in D_STRATEGIES:
+            raise ValueError(f"Unknown d strategy {d_strategy!r}, choose from {sorted(D_STRATEGIES)}")
+        self.edges = None  # List of tuples (u, v), only kept with keep_edges=True
+        self.adj_list = None  # Adjacency lists, only kept with keep_edges=True
         self.V = V  # Number of vertices
         self.E = E  # Number of edges
-        self.d = math.ceil(2 * E / V) + 1  # Updated d calculation
+        self.d_strategy = d_strategy  # How _create_adjacency_matrix picks d, see select_d
+        self.d = math.ceil(2 * E / V) + 1  # Updated d calculation; replaced by the d_strategy choice
+        self.d_selection = None  # select_d report of the built matrix
         self.dummy_row_count = 0  # Count rows with all zeros
-        self.adjacency_matrix = []  # 2V x (d+1) matrix
+        self.adjacency_matrix = None  # 2V x (d+1) int32 matrix
         self.outer_loop_count = 0  # Track outer loop cycles
-        self.processed_queue_vertices = []  # List of vertices already processed in queue
-        self.vertex_bits = [0] * (V + 1)  # Bits for vertices 1 to V
-        self.processed_rows = set()  # Track which rows have been processed
+        self.processed_queue_vertices = []  # Vertices already processed in queue, in processing order
+        self.processed_bits = np.zeros(V + 1, dtype=bool)  # processed_bits[v]: v is in processed_queue_vertices
+        self.vertex_bits = np.zeros(V + 1, dtype=bool)  # Bits for vertices 1 to V
+        self.row_start = None  # row_start[v]: first matrix row of vertex v (CSR offsets)
+        self.row_count = None  # row_count[v]: number of matrix rows of vertex v
+        self.row_cursor = [0] * (V + 1)  # Next unprocessed row of each vertex, relative to row_start
         self.max_queue_size = 0  # Track maximum queue size ever reached
         self.max_real_queue_size = 0  # Track maximum real (non-dummy) entries in queue
+        self.dropped_vertex_count = 0  # Non-dummy queue entries discarded by compaction
+        self.last_stats = None  # RunStats of the last run_algorithm(..., profile=True)
+
+    @classmethod
+    def from_arrays(cls, adjacency_matrix, row_start, row_count, V, E, dummy_row_count,
+                    d_strategy="ceil_2e_over_v", d_selection=None):
+        """
+        Wrap an already built d-normalized matrix and its row offsets, without
+        an edge list; d_strategy and d_selection record how its d was picked
+        """
+        algorithm = cls.__new__(cls)
+        algorithm._init_state(V, E, d_strategy)
+        algorithm.d_selection = d_selection
+        algorithm.d = adjacency_matrix.shape[1] - 1
+        algorithm.dummy_row_count = dummy_row_count
+        algorithm.adjacency_matrix = adjacency_matrix
+        algorithm.row_start = row_start
+        algorithm.row_count = row_count
+        return algorithm
+
+    @classmethod
+    def from_edge_file(cls, path, V=None, binary=None, zero_based=False, chunk_edges=1 << 20,
+                       d_strategy="ceil_2e_over_v"):
+        """
+        Build the d-normalized matrix by streaming an edge file, without
+        materializing the edge list.
+
+        path: SNAP-style text ("u v" per line, "#" comments, extra columns
+        ignored) or a binary file of int32 (u, v) pairs, which is memory-mapped.
+        binary: file format; by default binary for .bin / .i32 suffixes.
+        V: number of vertices; by default the largest vertex id.
+        zero_based: vertex ids start at 0 and are shifted to 1..V.
+        d_strategy: how d is picked, see select_d.
+
+        The file is read twice: once to count degrees, once to scatter edges
+        into the preallocated matrix, chunk_edges edges at a time.
+        """
+        if binary is None:
+            binary = os.path.splitext(path)[1] in (".bin", ".i32")
+
+        def read_chunks():
+            return _iter_edge_chunks(path, binary, zero_based, chunk_edges)
+
+        # Pass 1: degree counting, growing the count array when V is unknown
+        degrees = np.zeros((V or 0) + 1, dtype=np.int64)
+        min_vertex = 1
+        max_vertex = 0
+        E = 0
+        for chunk in read_chunks():
+            if len(chunk) == 0:
+                continue
+            min_vertex = min(min_vertex, int(chunk.min()))
+            max_vertex = max(max_vertex, int(chunk.max()))
+            if min_vertex < 1:
+                raise ValueError(f"Edge file {path} has vertex ids below {0 if zero_based else 1}")
+            counts = np.bincount(chunk[:, 0])
+            if len(counts) > len(degrees):
+                degrees = np.concatenate([degrees, np.zeros(len(counts) - len(degrees), dtype=np.int64)])
+            degrees[:len(counts)] += counts
+            E += len(chunk)
+        V = V or max_vertex
+        if max_vertex > V:
+            raise ValueError(f"Edge file {path} has vertex ids above V = {V}")
+        degrees = np.concatenate([degrees, np.zeros(V + 1 - len(degrees), dtype=np.int64)])
+
+        # Pass 2: scatter into the matrix
+        algorithm = cls.__new__(cls)
+        algorithm._init_state(V, E, d_strategy)
+        algorithm._create_adjacency_matrix(read_chunks, degrees[1:])
+        return algorithm
+
+    def save(self, path):
+        """
+        Write the d-normalized graph to the directory path: header.json (V, E,
+        d, d_strategy, d_selection, dummy_row_count, format version) and
+        adjacency_matrix.npy, row_start.npy and row_count.npy. The header is
+        written last, so a directory without one is an incomplete save.
+
+        Each file is written under a temporary name and moved into place, so
+        saving a graph loaded (memory-mapped) from path back to path never
+        writes over the files its arrays are mapped from.
+        """
+        os.makedirs(path, exist_ok=True)
+        header_path = os.path.join(path, "header.json")
+        if os.path.exists(header_path):
+            os.remove(header_path)
+        for name in GRAPH_ARRAYS:
+            array_path = os.path.join(path, name + ".npy")
+            with open(array_path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(array_path + ".tmp", array_path)
+        header = {
+            "format": GRAPH_FORMAT,
+            "version": GRAPH_FORMAT_VERSION,
+            "V": self.V,
+            "E": self.E,
+            "d": self.d,
+            "d_strategy": self.d_strategy,
+            "d_selection": self.d_selection,
+            "dummy_row_count": self.dummy_row_count,
+            "rows": len(self.adjacency_matrix),
+        }
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(header_path + ".tmp", header_path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a graph written by save. With mmap the arrays are memory-mapped
+        read-only, so loading does not read the matrix and processes loading
+        the same directory share the page cache; run_algorithm only reads them.
+        Headers without d_strategy (older saves) load as the default strategy.
+        """
+        header_path = os.path.join(path, "header.json")
+        if not os.path.exists(header_path):
+            raise FileNotFoundError(f"No saved graph in {path} (header.json is missing)")
+        with open(header_path) as f:
+            header = json.load(f)
+        if header.get("format") != GRAPH_FORMAT or header.get("version") != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph format in {path}: {header.get('format')} "
+                             f"version {header.get('version')}")
+
+        mmap_mode = "r" if mmap else None
+        matrix, row_start, row_count = (np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+                                        for name in GRAPH_ARRAYS)
+        V = header["V"]
+        if (matrix.shape, row_start.shape, row_count.shape) != ((header["rows"], header["d"] + 1), (V + 1,), (V + 1,)):
+            raise ValueError(f"Saved arrays in {path} do not match the header")
+        return cls.from_arrays(matrix, row_start, row_count, V, header["E"], header["dummy_row_count"],
+                               header.get("d_strategy", "ceil_2e_over_v"), header.get("d_selection"))
+
+    def _create_adjacency_matrix(self, read_chunks, degrees=None):
+        """Create the 2V x (d+1) adjacency matrix with padding and overflow handling
+
+        The matrix is a contiguous int32 array filled from chunks of (u, v) edge
+        arrays: read_chunks() returns an iterable of (k, 2) arrays and is called
+        once to count degrees (unless degrees are given) and once to scatter.
+        Row layout: vertex marker, then d neighbors (0 padded), overflow rows
+        for vertices with more than d edges, and 0-marker rows padding the
+        matrix up to 2V rows. Neighbors keep their edge-list order. d is
+        picked from the degrees with d_strategy (select_d).
+        """
+        if degrees is None:
+            degrees = np.zeros(self.V + 1, dtype=np.int64)
+            for chunk in read_chunks():
+                degrees += np.bincount(chunk[:, 0], minlength=self.V + 1)
+            degrees = degrees[1:]
+
+        self.d_selection = select_d(degrees, self.V, self.E, self.d_strategy)
+        self.d = self.d_selection["d"]
+        self._create_vertex_row_mapping(degrees)
+        used_rows = int(self.row_count.sum())
+
+        self.adjacency_matrix = np.zeros((max(2 * self.V, used_rows), self.d + 1), dtype=np.int32)
+        self.adjacency_matrix[:used_rows, 0] = np.repeat(np.arange(1, self.V + 1), self.row_count[1:])
+
+        filled = np.zeros(self.V + 1, dtype=np.int64)  # Edges of each vertex scattered so far
+        for chunk in read_chunks():
+            # Stable sort keeps each vertex's neighbors in edge-list order
+            order = np.argsort(chunk[:, 0], kind="stable")
+            sources = chunk[order, 0]
+            targets = chunk[order, 1]
+
+            # Position of each edge within its source's neighbor list
+            rank = filled[sources] + np.arange(len(sources)) - np.searchsorted(sources, sources)
+            self.adjacency_matrix[self.row_start[sources] + rank // self.d, 1 + rank % self.d] = targets
+            filled += np.bincount(sources, minlength=self.V + 1)
+
+        # Vertices without edges get one marker row; unused rows are all zeros
+        self.dummy_row_count = int(np.count_nonzero(degrees == 0)) + (len(self.adjacency_matrix) - used_rows)
+
+    def run_algorithm(self, start_vertex, n=None, compaction_del=None, verbosity=TRACE, sink=None,
+                      compaction_engine="partition", plan=None, profile=False,
+                      queue_factory=None):
+        """
+        Run the traversal from start_vertex, compacting the queue to compaction_del
+        entries every n outer loop iterations.
+
+        verbosity: SILENT (no output, no formatting work), SUMMARY (setup and final
+        statistics) or TRACE (full per-iteration output); names are accepted too.
+        sink: optional destination for structured records, see _open_sink: one
+        record per iteration and compaction and a final summary record, at
+        SUMMARY as well as TRACE, so SUMMARY with a sink is a quiet run with full
+        telemetry. A sink needs SUMMARY or TRACE; SILENT with a sink raises. The
+        sink is closed when the run ends, also if it raises.
+        compaction_engine: name of the queue compaction network from 8.py
+        ("partition", "bitonic" or "goodrich"); all give the same queue contents.
+        plan: configuration dict from plan() in 16.py; its n, compaction_del and
+        compaction_engine replace the arguments.
+        profile: collect a RunStats (row, dummy row and dummy pop counters,
+        compaction counts, time in row processing vs. compaction and a
+        queue-length histogram), store it in last_stats and return it instead
+        of the outer loop count. Without it the loop only pays a few boolean checks.
+        queue_factory: callable taking the queue capacity and returning the
+        queue that holds the entries (default: an in-memory ObliviousQueue).
+        """
+        if plan is not None:
+            n = plan["n"]
+            compaction_del = plan["compaction_del"]
+            compaction_engine = plan.get("compaction_engine", compaction_engine)
+        if n is None or compaction_del is None:
+            raise ValueError("run_algorithm needs n and compaction_del, or a plan")
+        if compaction_engine not in compaction.COMPACTION_ENGINES:
+            raise ValueError(f"Unknown compaction engine {compaction_engine!r}")
+        if isinstance(verbosity, str) and verbosity in VERBOSITY_LEVELS:
+            verbosity = VERBOSITY_LEVELS[verbosity]
+        elif isinstance(verbosity, str) or verbosity not in VERBOSITY_LEVELS.values():
+            raise ValueError(f"Unknown verbosity {verbosity!r}, choose from {sorted(VERBOSITY_LEVELS)} "
+                             f"or {sorted(VERBOSITY_LEVELS.values())}")
+        if sink is not None and verbosity < SUMMARY:
+            raise ValueError("A telemetry sink needs verbosity SUMMARY or TRACE; SILENT records nothing")
+        emit, close_sink = _open_sink(sink) if sink is not None else (None, None)
+        try:
+            return self._traverse(start_vertex, n, compaction_del, verbosity, emit, compaction_engine, profile,
+                                  queue_factory)
+        finally:
+            if close_sink is not None:
+                close_sink()
+
+    def _traverse(self, start_vertex, n, compaction_del, verbosity, emit, compaction_engine, profile, queue_factory):
+        """The run_algorithm loop; emit receives the telemetry records, or is None"""
+        trace = verbosity >= TRACE
+        summary = verbosity >= SUMMARY
+        records = emit is not None
 
-        self.adj_list = {i: [] for i in range(1, V + 1)}
-        for u, v in edges:
-            self.adj_list[u].append(v)
-
-        self._create_adjacency_matrix()
-
-    def _create_adjacency_matrix(self):
-        """Create the 2V x (d+1) adjacency matrix with padding and overflow handling"""
-        self.adjacency_matrix = []
-        row_count = 0
-
-        for vertex in range(1, self.V + 1):
-            outgoing_edges = self.adj_list[vertex]
-            edges_processed = 0
-
-            while edges_processed < len(outgoing_edges):
-                current_row = [vertex]
-                for i in range(self.d):
-                    if edges_processed < len(outgoing_edges):
-                        current_row.append(outgoing_edges[edges_processed])
-                        edges_processed += 1
-                    else:
-                        current_row.append(0)
-                self.adjacency_matrix.append(current_row)
-                row_count += 1
-
-            if len(outgoing_edges) == 0:
-                dummy_row = [vertex] + [0] * self.d
-                self.adjacency_matrix.append(dummy_row)
-                self.dummy_row_count += 1  # Count dummy row
-                row_count += 1
-
-        while row_count < 2 * self.V:
-            dummy_row = [0] + [0] * self.d
-            self.adjacency_matrix.append(dummy_row)
-            self.dummy_row_count += 1  # Count dummy row
-            row_count += 1
-
-    def run_algorithm(self, start_vertex, n, compaction_del):
         self.outer_loop_count = 0
-        queue = deque()
-        vertex_row_map = self._create_vertex_row_mapping()
+        stats = RunStats() if profile else None
+        self.last_stats = stats
+        queue_lengths = []
+        clock = time.perf_counter
+        if profile:
+            run_started = clock()
+        # Plain lists: scalar indexing in the loop is cheaper than on NumPy arrays
+        row_start = self.row_start.tolist()
+        row_count = self.row_count.tolist()
 
         self.processed_queue_vertices = []
-        self.vertex_bits = [0] * (self.V + 1)
-        self.processed_rows = set()
+        self.processed_bits = np.zeros(self.V + 1, dtype=bool)
+        processed_bits = self.processed_bits
+        self.vertex_bits = np.zeros(self.V + 1, dtype=bool)
+        self.row_cursor = [0] * (self.V + 1)
+        row_cursor = self.row_cursor
         self.max_queue_size = 0  # Reset max queue size for new run
         self.max_real_queue_size = 0  # Reset max real queue size for new run
+        self.dropped_vertex_count = 0
+        # The queue never holds more than compaction_del + n * d entries, nor more than the matrix rows hold
+        capacity = oblivious_queue.ObliviousQueue.capacity_for(n, self.d, compaction_del, len(self.adjacency_matrix))
+        queue = CountingQueue(self.vertex_bits, capacity, queue_factory)
 
         current_vertex = start_vertex
         iteration_count = 0
 
-        if current_vertex not in self.processed_queue_vertices:
+        if not processed_bits[current_vertex]:
+            processed_bits[current_vertex] = True
             self.processed_queue_vertices.append(current_vertex)
-        self.vertex_bits[current_vertex] = 1
+        self.vertex_bits[current_vertex] = True
 
-        print(f"Starting algorithm with vertex {start_vertex}")
-        print(f"d = {self.d}, n = {n}, compaction_del = {compaction_del}")
-        print(f"Adjacency matrix size: {len(self.adjacency_matrix)} x {self.d + 1}")
-        print(f"Initial vertex bits: {self.vertex_bits[1:]}")
-        print()
+        if summary:
+            print(f"Starting algorithm with vertex {start_vertex}")
+            print(f"d = {self.d}, n = {n}, compaction_del = {compaction_del}")
+            print(f"Adjacency matrix size: {len(self.adjacency_matrix)} x {self.d + 1}")
+            print(f"Queue capacity: {queue.entries.capacity} entries ({queue.entries.nbytes} bytes)")
+        if trace:
+            print(f"Initial vertex bits: {self.get_vertex_bits()}")
+        if summary:
+            print()
 
         while True:
             self.outer_loop_count += 1
             iteration_count += 1
 
-            print(f"=== Outer Loop Iteration {self.outer_loop_count} ===")
-            print(f"Current vertex to process: {current_vertex}")
+            if trace:
+                print(f"=== Outer Loop Iteration {self.outer_loop_count} ===")
+                print(f"Current vertex to process: {current_vertex}")
+            processed_vertex = current_vertex
+            row_to_process = None
 
             edges_added = False
-            if current_vertex in vertex_row_map:
-                rows_for_vertex = vertex_row_map[current_vertex]
-                row_to_process = None
-                for row_idx in rows_for_vertex:
-                    if row_idx not in self.processed_rows:
-                        row_to_process = row_idx
-                        break
-
-                if row_to_process is not None:
-                    self.processed_rows.add(row_to_process)
+            valid_vertex = 1 <= current_vertex <= self.V
+            if valid_vertex:
+                if row_cursor[current_vertex] < row_count[current_vertex]:
+                    if profile:
+                        row_started = clock()
+                    row_to_process = row_start[current_vertex] + row_cursor[current_vertex]
+                    row_cursor[current_vertex] += 1
                     original_row = self.adjacency_matrix[row_to_process]
-                    vertex_marker = original_row[0]
                     edges_in_row = original_row[1:]
                     
                     # Process row and get which vertices were real before processing
-                    processed_edges, real_vertices_added = self._process_row_with_vertex_bits(edges_in_row)
+                    processed_edges, real_vertices_added = self._process_row_with_vertex_bits(edges_in_row, queue, trace)
                     
                     # Add edges to queue
-                    for edge in processed_edges:
-                        queue.append(edge)
+                    queue.extend_row(processed_edges)
                     
                     # Update max real queue size based on real vertices that were added
                     if len(real_vertices_added) > 0:
-                        # Count current real entries in queue (these would be from previous iterations)
-                        current_real_in_queue = 0
-                        for x in queue:
-                            if x != 0 and 1 <= x <= self.V and self.vertex_bits[x] == 0:
-                                current_real_in_queue += 1
+                        # Current real entries in queue (these would be from previous iterations)
+                        current_real_in_queue = queue.real_count
                         
                         # The max real queue size should consider the moment when real vertices were added
                         # Since real_vertices_added were just processed, they're no longer "real" in queue
@@ -124,46 +575,55 @@ class GraphAlgorithm:
                             self.max_real_queue_size = peak_real_size
                     
                     edges_added = True
-                    print(f"Processing row {row_to_process} (vertex marker: {vertex_marker})")
-                    print(f"Original edges: {edges_in_row}")
-                    print(f"Processed edges: {processed_edges}")
-                    print(f"Real vertices added: {real_vertices_added}")
-                    print(f"Vertex bits after processing: {self.vertex_bits[1:]}")
-                else:
+                    if profile:
+                        stats.row_seconds += clock() - row_started
+                        stats.rows_processed += 1
+                        if not edges_in_row.any():
+                            stats.dummy_rows += 1
+                    if trace:
+                        print(f"Processing row {row_to_process} (vertex marker: {int(original_row[0])})")
+                        print(f"Original edges: {edges_in_row.tolist()}")
+                        print(f"Processed edges: {processed_edges.tolist()}")
+                        print(f"Real vertices added: {real_vertices_added.tolist()}")
+                        print(f"Vertex bits after processing: {self.get_vertex_bits()}")
+                elif trace:
                     print(f"No more unprocessed rows for vertex {current_vertex}")
 
-            all_rows_done = all(row_idx in self.processed_rows for row_idx in vertex_row_map.get(current_vertex, []))
+            all_rows_done = not valid_vertex or row_cursor[current_vertex] == row_count[current_vertex]
 
             if all_rows_done:
-                if current_vertex not in self.processed_queue_vertices:
+                if not processed_bits[current_vertex]:
+                    processed_bits[current_vertex] = True
                     self.processed_queue_vertices.append(current_vertex)
-                self.vertex_bits[current_vertex] = 1
+                queue.set_vertex_bit(current_vertex)
                 if len(self.processed_queue_vertices) == self.V:
-                    print("All vertices processed in queue. Algorithm complete.")
+                    if trace:
+                        print("All vertices processed in queue. Algorithm complete.")
                     break
                 if queue:
                     next_vertex = queue.popleft()
-                    print(f"All rows for vertex {current_vertex} processed. Switching to next vertex from queue: {next_vertex}")
+                    if profile:
+                        if next_vertex == 0:
+                            stats.dummy_pops += 1
+                        else:
+                            stats.real_pops += 1
+                    if trace:
+                        print(f"All rows for vertex {current_vertex} processed. Switching to next vertex from queue: {next_vertex}")
                     if next_vertex != 0:
                         current_vertex = next_vertex
-                    else:
+                    elif trace:
                         print("Top element is dummy, doing nothing")
                 elif not edges_added:
-                    print("No edges added and queue is empty - algorithm may be complete")
+                    if trace:
+                        print("No edges added and queue is empty - algorithm may be complete")
                     break
 
-            print(f"Current queue: {list(queue)}")
-            print(f"Queue size: {len(queue)}")
-            
-            # Count real (non-dummy and unprocessed) entries in queue
             # Real entries are those that are: 1) non-zero AND 2) not yet processed (vertex_bit = 0)
-            real_entries = []
-            for x in queue:
-                if x != 0 and 1 <= x <= self.V and self.vertex_bits[x] == 0:
-                    real_entries.append(x)
-            
-            real_queue_size = len(real_entries)
+            real_queue_size = queue.real_count
             
+            if profile:
+                queue_lengths.append(len(queue))
+
             # Update max queue size if current size is larger
             if len(queue) > self.max_queue_size:
                 self.max_queue_size = len(queue)
@@ -171,91 +631,148 @@ class GraphAlgorithm:
             # Update max real queue size if current real size is larger
             if real_queue_size > self.max_real_queue_size:
                 self.max_real_queue_size = real_queue_size
-                
-            print(f"Real entries in queue (unprocessed): {real_entries}")
-            print(f"Real queue size: {real_queue_size}")
-            print(f"Max queue size ever reached: {self.max_queue_size}")
-            print(f"Max real queue size ever reached: {self.max_real_queue_size}")
+
+            if trace:
+                print(f"Current queue: {list(queue)}")
+                print(f"Queue size: {len(queue)}")
+                print(f"Real entries in queue (unprocessed): {queue.real_entries()}")
+                print(f"Real queue size: {real_queue_size}")
+                print(f"Max queue size ever reached: {self.max_queue_size}")
+                print(f"Max real queue size ever reached: {self.max_real_queue_size}")
+            if records:
+                emit({
+                    "event": "iteration",
+                    "iteration": iteration_count,
+                    "vertex": processed_vertex,
+                    "row": row_to_process,
+                    "queue_length": len(queue),
+                    "real_count": real_queue_size,
+                    "dummy_count": queue.dummy_count,
+                })
 
             if iteration_count % n == 0:
-                print(f"\n--- Compaction at iteration {iteration_count} ---")
-                self._compact_queue(queue, compaction_del)
-                print(f"Queue after compaction: {list(queue)}")
+                if trace:
+                    print(f"\n--- Compaction at iteration {iteration_count} ---")
+                if profile:
+                    compaction_started = clock()
+                before, after, dropped_vertices = self._compact_queue(queue, compaction_del, trace, compaction_engine)
+                self.dropped_vertex_count += dropped_vertices
+                if profile:
+                    stats.compaction_seconds += clock() - compaction_started
+                    stats.compactions += 1
+                    stats.compaction_elements_dropped += before - after
+                    stats.compaction_vertices_dropped += dropped_vertices
+                if trace:
+                    print(f"Queue after compaction: {list(queue)}")
+                if records:
+                    emit({
+                        "event": "compaction",
+                        "iteration": iteration_count,
+                        "before": before,
+                        "after": after,
+                        "dropped_vertices": dropped_vertices,
+                        "real_count": queue.real_count,
+                    })
 
             if len(queue) == 0 and all_rows_done:
                 break
 
-        print(f"\nAlgorithm completed after {self.outer_loop_count} outer loop iterations")
-        print(f"Final processed queue vertices: {self.processed_queue_vertices}")
-        print(f"Final vertex bits: {self.vertex_bits[1:]}")
-        print(f"Total rows processed: {len(self.processed_rows)}")
-        print(f"Maximum queue size ever reached: {self.max_queue_size}")
-        print(f"Maximum real queue size ever reached: {self.max_real_queue_size}")
+        if profile:
+            stats.total_seconds = clock() - run_started
+            stats.iterations = self.outer_loop_count
+            stats.queue_length_histogram = np.bincount(queue_lengths, minlength=1)
+        if summary:
+            print(f"\nAlgorithm completed after {self.outer_loop_count} outer loop iterations")
+        if trace:
+            print(f"Final processed queue vertices: {self.processed_queue_vertices}")
+            print(f"Final vertex bits: {self.get_vertex_bits()}")
+        elif summary:
+            print(f"Processed vertices: {len(self.processed_queue_vertices)}/{self.V}")
+        if summary:
+            print(f"Total rows processed: {sum(row_cursor)}")
+            print(f"Maximum queue size ever reached: {self.max_queue_size}")
+            print(f"Maximum real queue size ever reached: {self.max_real_queue_size}")
+        if emit is not None:
+            emit({
+                "event": "summary",
+                "outer_loop_count": self.outer_loop_count,
+                "processed_vertices": len(self.processed_queue_vertices),
+                "rows_processed": sum(row_cursor),
+                "max_queue_size": self.max_queue_size,
+                "max_real_queue_size": self.max_real_queue_size,
+                "dropped_vertices": self.dropped_vertex_count,
+            })
+        if profile:
+            return stats
         return self.outer_loop_count
 
-    def _create_vertex_row_mapping(self):
-        vertex_row_map = {}
-        current_row = 0
+    def _create_vertex_row_mapping(self, degrees):
+        """Compute CSR-style row offsets from the out-degree of vertices 1..V
 
-        for vertex in range(1, self.V + 1):
-            vertex_row_map[vertex] = []
-            outgoing_edges = self.adj_list[vertex]
+        Every vertex owns ceil(degree / d) consecutive rows, and at least one.
+        Arrays are indexed by vertex id; index 0 is unused.
+        """
+        self.row_count = np.zeros(self.V + 1, dtype=np.int64)
+        self.row_count[1:] = np.maximum(1, -(-np.asarray(degrees) // self.d))
+        self.row_start = np.zeros(self.V + 1, dtype=np.int64)
+        np.cumsum(self.row_count[1:-1], out=self.row_start[2:])
 
-            if len(outgoing_edges) == 0:
-                vertex_row_map[vertex].append(current_row)
-                current_row += 1
-            else:
-                edges_processed = 0
-                while edges_processed < len(outgoing_edges):
-                    vertex_row_map[vertex].append(current_row)
-                    edges_processed += self.d
-                    current_row += 1
-
-        return vertex_row_map
-
-    def _process_row_with_vertex_bits(self, row):
-        processed_row = []
-        real_vertices_added = []  # Track which vertices were kept as real
-
-        for vertex in row:
-            if vertex == 0:
-                processed_row.append(0)
-            elif 1 <= vertex <= self.V:
-                if self.vertex_bits[vertex] == 0:
-                    self.vertex_bits[vertex] = 1
-                    processed_row.append(vertex)
-                    real_vertices_added.append(vertex)  # This was a real vertex we kept
-                    print(f"  Vertex {vertex}: bit 0->1, keeping vertex")
-                else:
-                    processed_row.append(0)
-                    print(f"  Vertex {vertex}: bit already 1, converting to dummy edge")
-            else:
-                processed_row.append(0)
-                print(f"  Invalid vertex {vertex}, converting to dummy edge")
+    def _process_row_with_vertex_bits(self, row, queue=None, trace=True):
+        """
+        Process a row of neighbors with array operations: gather their bits,
+        keep the first occurrence of every vertex whose bit is 0 and set those
+        bits in one scatter; all other entries become dummies.
+
+        Returns: (processed row, vertices kept as real), both NumPy arrays
+        """
+        row = np.asarray(row)
+        valid = (row >= 1) & (row <= self.V)
+        keep = valid & ~self.vertex_bits[np.where(valid, row, 0)]
+        kept = np.flatnonzero(keep)
+        if len(kept) > 1:
+            # A vertex listed twice in the row is only kept the first time
+            ordered = np.sort(row[kept])
+            if (ordered[1:] == ordered[:-1]).any():
+                _, first = np.unique(row[kept], return_index=True)
+                keep[kept] = False
+                kept = np.sort(kept[first])
+                keep[kept] = True
+        real_vertices_added = row[kept]
 
-        return processed_row, real_vertices_added
+        if queue is not None:
+            queue.set_vertex_bits(real_vertices_added)
+        else:
+            self.vertex_bits[real_vertices_added] = True
 
-    def _compact_queue(self, queue, compaction_del):
-        queue_list = list(queue)
-        queue.clear()
+        if trace:
+            for vertex, kept_vertex, valid_vertex in zip(row.tolist(), keep.tolist(), valid.tolist()):
+                if vertex == 0:
+                    continue
+                if kept_vertex:
+                    print(f"  Vertex {vertex}: bit 0->1, keeping vertex")
+                elif valid_vertex:
+                    print(f"  Vertex {vertex}: bit already 1, converting to dummy edge")
+                else:
+                    print(f"  Invalid vertex {vertex}, converting to dummy edge")
 
-        real_elements = [x for x in queue_list if x != 0]
-        dummy_elements = [x for x in queue_list if x == 0]
+        return np.where(keep, row, 0), real_vertices_added
 
-        compacted = real_elements + dummy_elements
-        compacted = compacted[:compaction_del]
+    def _compact_queue(self, queue, compaction_del, trace=True, engine="partition"):
+        before = len(queue)
 
-        for element in compacted:
-            queue.append(element)
+        # Real elements first, then dummies, truncated to compaction_del
+        dropped_vertices = queue.compact(compaction_del, engine)
 
-        print(f"Compaction: {len(queue_list)} -> {len(compacted)} elements")
+        if trace:
+            print(f"Compaction: {before} -> {len(queue)} elements")
+        return before, len(queue), dropped_vertices
 
     def print_adjacency_matrix(self):
         print("Adjacency Matrix (2V x (d+1)):")
         print("Format: [vertex_marker, edge1, edge2, ..., edged]")
         for i, row in enumerate(self.adjacency_matrix):
-            vertex_marker = row[0]
-            edges = row[1:]
+            vertex_marker = int(row[0])
+            edges = row[1:].tolist()
             print(f"Row {i}: [vertex:{vertex_marker}] {edges}")
         print()
 
@@ -263,7 +780,7 @@ class GraphAlgorithm:
         return self.processed_queue_vertices
 
     def get_vertex_bits(self):
-        return self.vertex_bits[1:]
+        return self.vertex_bits[1:].astype(int).tolist()
 
     def get_outer_loop_count(self):
         return self.outer_loop_count
@@ -277,90 +794,168 @@ class GraphAlgorithm:
     def get_max_real_queue_size(self):
         return self.max_real_queue_size
 
+    def get_dropped_vertex_count(self):
+        return self.dropped_vertex_count
+
     def reset_tracking(self):
         self.processed_queue_vertices = []
-        self.vertex_bits = [0] * (self.V + 1)
-        self.processed_rows = set()
+        self.processed_bits = np.zeros(self.V + 1, dtype=bool)
+        self.vertex_bits = np.zeros(self.V + 1, dtype=bool)
+        self.row_cursor = [0] * (self.V + 1)
         self.max_queue_size = 0  # Reset max queue size
         self.max_real_queue_size = 0  # Reset max real queue size
+        self.dropped_vertex_count = 0
+
+
+def _edge_keys(edges, V):
+    """Direction-independent key of each (u, v) edge, for duplicate detection"""
+    low = np.minimum(edges[:, 0], edges[:, 1]).astype(np.int64)
+    high = np.maximum(edges[:, 0], edges[:, 1]).astype(np.int64)
+    return low * (V + 1) + high
 
-def generate_large_test_case(V, target_E):
+
+def _grid_edges(V):
+    """Right and down edges of a row-major grid of side ceil(sqrt(V)); vertex 1 reaches all"""
+    side = math.isqrt(V - 1) + 1 if V > 1 else 1
+    vertices = np.arange(1, V + 1)
+    right = vertices[(vertices % side != 0) & (vertices + 1 <= V)]
+    down = vertices[vertices + side <= V]
+    return np.concatenate([np.stack([right, right + 1], axis=1), np.stack([down, down + side], axis=1)])
+
+
+GRAPH_FAMILIES = ("uniform", "power_law", "grid")
+
+
+def generate_large_test_case(V, target_E, family="uniform", seed=42, power_law_exponent=2.5):
     """
     Generate a well-connected graph with V vertices and approximately target_E edges.
-    Ensures the graph is strongly connected and has good distribution of edges.
+    Ensures every vertex is reachable from vertex 1 and has good distribution of edges.
+
+    family: "uniform" (random tree plus uniform extra edges), "power_law"
+    (random tree plus Chung-Lu extra edges with degree exponent
+    power_law_exponent) or "grid" (row-major grid plus uniform extra edges).
+    All sampling is batched with NumPy and reproducible for a given seed.
+
+    Returns: (E, 2) int32 array of (u, v) edges
     """
-    edges = []
-    random.seed(42)  # For reproducible results
-    
-    # Ensure we have enough edges to connect all vertices
-    min_edges_needed = V - 1
-    if target_E < min_edges_needed:
-        print(f"Warning: target_E ({target_E}) is less than minimum needed for connectivity ({min_edges_needed})")
-        target_E = min_edges_needed
-    
-    # Step 1: Create a spanning tree to ensure basic connectivity
+    if family not in GRAPH_FAMILIES:
+        raise ValueError(f"Unknown graph family {family!r}, choose from {GRAPH_FAMILIES}")
+    rng = np.random.default_rng(seed)  # For reproducible results
+
+    # Step 1: Create a connected base graph
     # This guarantees all vertices are reachable
-    print(f"Creating spanning tree with {V-1} edges...")
-    for i in range(2, V + 1):
-        parent = random.randint(1, i - 1)
-        edges.append((parent, i))
-    
-    edge_set = set(edges)
-    print(f"Spanning tree created. Current edges: {len(edges)}")
-    
-    # Step 2: Add additional edges to strengthen connectivity
-    # Focus on creating a well-connected graph
-    remaining_edges = target_E - (V - 1)
+    if family == "grid":
+        print(f"Creating grid base graph for {V} vertices...")
+        base = _grid_edges(V)
+    else:
+        print(f"Creating spanning tree with {V-1} edges...")
+        children = np.arange(2, V + 1)
+        parents = (rng.random(V - 1) * (children - 1)).astype(np.int64) + 1
+        base = np.stack([parents, children], axis=1)
+
+    if target_E < len(base):
+        print(f"Warning: target_E ({target_E}) is less than minimum needed for connectivity ({len(base)})")
+        target_E = len(base)
+    print(f"Base graph created. Current edges: {len(base)}")
+
+    # Step 2: Add additional edges in batches, without self-loops or duplicates (both directions)
+    if family == "power_law":
+        # Chung-Lu endpoints: the vertex of rank x is picked with weight x^(-1/(gamma-1)),
+        # sampled by inverting the continuous CDF; ranks map to vertices in random order
+        vertex_of_rank = rng.permutation(V) + 1
+        a = 1.0 / (power_law_exponent - 1.0)
+
+        def sample(count):
+            u = rng.random((count, 2))
+            if a == 1.0:
+                ranks = (V + 1.0) ** u
+            else:
+                ranks = ((((V + 1.0) ** (1.0 - a)) - 1.0) * u + 1.0) ** (1.0 / (1.0 - a))
+            return vertex_of_rank[np.minimum(ranks.astype(np.int64), V) - 1]
+    else:
+        def sample(count):
+            return rng.integers(1, V + 1, (count, 2))
+
+    remaining_edges = target_E - len(base)
     print(f"Adding {remaining_edges} more edges for better connectivity...")
-    
+    base_keys = np.sort(_edge_keys(base, V))
+    # Extra edges are kept as sorted keys: 2 * undirected key + (u > v) for the direction
+    extra_keys = np.empty(0, dtype=np.int64)
     attempts = 0
-    max_attempts = remaining_edges * 5  # Increase attempts for better coverage
-    
-    while len(edges) < target_E and attempts < max_attempts:
-        u = random.randint(1, V)
-        v = random.randint(1, V)
-        
-        # Avoid self-loops and duplicate edges (both directions)
-        if u != v and (u, v) not in edge_set and (v, u) not in edge_set:
-            edges.append((u, v))
-            edge_set.add((u, v))
-            edge_set.add((v, u))  # Mark both directions to avoid reverse duplicates
-        
-        attempts += 1
-    
-    # Step 3: Verify connectivity by checking if we can build adjacency list
-    adj_list_check = {i: [] for i in range(1, V + 1)}
-    for u, v in edges:
-        adj_list_check[u].append(v)
-    
-    # Count vertices with outgoing edges
-    vertices_with_edges = sum(1 for v in range(1, V + 1) if len(adj_list_check[v]) > 0)
-    
+    max_attempts = remaining_edges * 5  # Same sampling budget as one-at-a-time rejection
+
+    while len(extra_keys) < remaining_edges and attempts < max_attempts:
+        batch_size = min(max_attempts - attempts, int((remaining_edges - len(extra_keys)) * 1.2) + 16)
+        batch = sample(batch_size)
+        attempts += batch_size
+        batch = batch[batch[:, 0] != batch[:, 1]]
+        keys = np.sort(np.concatenate([extra_keys, 2 * _edge_keys(batch, V) + (batch[:, 0] > batch[:, 1])]))
+
+        # One edge per undirected pair, and none that duplicate a base edge
+        pairs = keys >> 1
+        keys = keys[np.r_[True, pairs[1:] != pairs[:-1]]]
+        pairs = keys >> 1
+        position = np.minimum(np.searchsorted(pairs, base_keys), len(pairs) - 1)
+        in_base = np.zeros(len(keys), dtype=bool)
+        in_base[position[pairs[position] == base_keys]] = True
+        keys = keys[~in_base]
+
+        if len(keys) > remaining_edges:
+            keys = np.sort(keys[rng.permutation(len(keys))[:remaining_edges]])
+        extra_keys = keys
+
+    # Decode keys and shuffle so the edge order is random rather than sorted
+    extra_keys = extra_keys[rng.permutation(len(extra_keys))]
+    low, high = np.divmod(extra_keys >> 1, V + 1)
+    reverse = (extra_keys & 1).astype(bool)
+    extra = np.stack([np.where(reverse, high, low), np.where(reverse, low, high)], axis=1)
+
+    edges = np.concatenate([base, extra])
+
+    # Step 3: Count vertices with outgoing edges
+    out_degree = np.bincount(edges[:, 0], minlength=V + 1)[1:]
+    vertices_with_edges = int(np.count_nonzero(out_degree))
+
     print(f"Generated graph with {len(edges)} edges (target was {target_E})")
     print(f"Vertices with outgoing edges: {vertices_with_edges}/{V}")
-    print(f"Graph density: {len(edges)/(V*(V-1)/2)*100:.2f}% of maximum possible edges")
-    
-    # Additional check: ensure no isolated vertices by adding more edges if needed
-    isolated_vertices = [v for v in range(1, V + 1) if len(adj_list_check[v]) == 0]
-    if isolated_vertices:
+    if V > 1:
+        print(f"Graph density: {len(edges)/(V*(V-1)/2)*100:.2f}% of maximum possible edges")
+
+    # Additional check: give vertices without outgoing edges one, while the edge budget lasts
+    isolated_vertices = np.flatnonzero(out_degree == 0) + 1
+    if len(isolated_vertices) and vertices_with_edges:
         print(f"Warning: Found {len(isolated_vertices)} vertices with no outgoing edges")
-        print(f"Isolated vertices: {isolated_vertices[:10]}...")  # Show first 10
-        
+        print(f"Isolated vertices: {isolated_vertices[:10].tolist()}...")  # Show first 10
+
         # Add edges from isolated vertices to random connected vertices
-        for isolated_v in isolated_vertices:
-            if len(edges) < target_E:
-                # Find a random vertex that has edges
-                connected_vertices = [v for v in range(1, V + 1) if len(adj_list_check[v]) > 0]
-                if connected_vertices:
-                    target_v = random.choice(connected_vertices)
-                    if (isolated_v, target_v) not in edge_set and (target_v, isolated_v) not in edge_set:
-                        edges.append((isolated_v, target_v))
-                        edge_set.add((isolated_v, target_v))
-                        edge_set.add((target_v, isolated_v))
-                        adj_list_check[isolated_v].append(target_v)
-    
+        isolated_vertices = isolated_vertices[:max(0, target_E - len(edges))]
+        connected_vertices = np.flatnonzero(out_degree) + 1
+        targets = connected_vertices[rng.integers(0, len(connected_vertices), len(isolated_vertices))]
+        fixes = np.stack([isolated_vertices, targets], axis=1)
+        # An isolated vertex has no outgoing edges, so only a reverse edge can duplicate a fix
+        is_isolated = np.zeros(V + 1, dtype=bool)
+        is_isolated[isolated_vertices] = True
+        incoming = edges[is_isolated[edges[:, 1]]]
+        fixes = fixes[~np.isin(_edge_keys(fixes, V), _edge_keys(incoming, V))]
+        edges = np.concatenate([edges, fixes])
+
     print(f"Final graph: {len(edges)} edges, all vertices connected")
-    return edges
+    return edges.astype(np.int32)
+
+
+def random_multigraphs(rng, count, min_V, max_V):
+    """
+    Yield (algorithm, start_vertex) for count random multigraphs, duplicate
+    edges and self-loops included: V in [min_V, max_V), 1 to 4V edges, all
+    drawn from the NumPy Generator rng. Callers may draw from rng between
+    graphs; the sequence stays reproducible.
+    """
+    for _ in range(count):
+        V = int(rng.integers(min_V, max_V))
+        E = int(rng.integers(1, 4 * V + 1))
+        edges = rng.integers(1, V + 1, (E, 2)).tolist()
+        yield GraphAlgorithm(edges, V, E), int(rng.integers(1, V + 1))
+
 
 def main():
     print("=== SMALL TEST CASE ===")
@@ -374,6 +969,8 @@ def main():
     print(f"Vertices: {V_small}, Edges: {E_small}")
     print(f"d = ceil(2*{E_small}/{V_small}) + 1 = {algorithm_small.d}")
     print(f"Number of dummy rows (all zeros): {algorithm_small.get_dummy_row_count()}")
+    print(f"Padding ratio: {algorithm_small.d_selection['padding_ratio']:.2%}, "
+          f"overflow rows: {algorithm_small.d_selection['overflow_rows']}")
     print()
 
     algorithm_small.print_adjacency_matrix()
@@ -404,25 +1001,36 @@ def main():
     print(f"d = ceil(2*{E_large}/{V_large}) + 1 = {algorithm_large.d}")
     print(f"Number of dummy rows (all zeros): {algorithm_large.get_dummy_row_count()}")
     print(f"Adjacency matrix size: {len(algorithm_large.adjacency_matrix)} x {algorithm_large.d + 1}")
+    print("Matrix size for each d_strategy (select_d):")
+    degrees_large = np.bincount(edges_large[:, 0], minlength=V_large + 1)[1:]
+    for d_strategy in D_STRATEGIES:
+        selection = select_d(degrees_large, V_large, E_large, d_strategy)
+        print(f"  {d_strategy:>17}: d = {selection['d']}, cells = {selection['cells']}, "
+              f"padding ratio = {selection['padding_ratio']:.2%}, overflow rows = {selection['overflow_rows']}")
     print()
 
     # Don't print the adjacency matrix for large case (too big)
     print("Skipping adjacency matrix print for large case (too big to display)")
 
     start_vertex_large = 1
-    n_large = 10  # Compact every 1000 iterations for large case
-    compaction_del_large = 100  # Keep max 100 elements after compaction
+    planner = load_script(16)  # Imported here: 16.py itself imports this script
+    plan_large = planner.plan(V_large, E_large)
+    n_large = plan_large["n"]  # Compact every n iterations, as chosen by the planner
+    compaction_del_large = plan_large["compaction_del"]  # Queue entries kept after each compaction
 
     print(f"Running large algorithm with start_vertex={start_vertex_large}, n={n_large}, compaction_del={compaction_del_large}")
     print("This may take a while for a graph this size...")
     print()
 
-    cycle_count_large = algorithm_large.run_algorithm(start_vertex_large, n_large, compaction_del_large)
+    # Per-iteration trace output would dominate the run time at this size
+    cycle_count_large = algorithm_large.run_algorithm(start_vertex_large, verbosity=SUMMARY, plan=plan_large)
 
     print(f"\nLarge test - Final outer loop cycle count: {cycle_count_large}")
     print(f"Large test - Maximum queue size reached: {algorithm_large.get_max_queue_size()}")
     print(f"Large test - Maximum real queue size reached: {algorithm_large.get_max_real_queue_size()}")
     print(f"Large test - Total processed vertices: {len(algorithm_large.get_processed_vertices())}")
+    print(f"Large test - Vertices dropped by compaction: {algorithm_large.get_dropped_vertex_count()}")
+    print()
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,29 @@
 import math
 from collections import deque
 
+import numpy as np
+
+from siblings import load_script
+
+graph_algorithm = load_script(3)  # select_d and the d strategies
+
 class GraphAlgorithm:
-    def __init__(self, edges, V, E):
+    def __init__(self, edges, V, E, d_strategy="two_ceil_e_over_v"):
+        if d_strategy not in graph_algorithm.D_STRATEGIES:
+            raise ValueError(f"Unknown d strategy {d_strategy!r}, choose from {sorted(graph_algorithm.D_STRATEGIES)}")
         self.edges = edges  # List of tuples (u, v)
         self.V = V  # Number of vertices
         self.E = E  # Number of edges
-        self.d = 2 * math.ceil(E / V) + 1  # Calculate d
-        self.adjacency_matrix = []  # 2V x (d+1) matrix
+        self.d_strategy = d_strategy  # How d is picked, see select_d in 3.py
+        self.d = 2 * math.ceil(E / V) + 1  # Calculate d; replaced by the d_strategy choice
+        self.d_selection = None  # select_d report of the built matrix
+        self.adjacency_matrix = None  # 2V x (d+1) int32 matrix
         self.outer_loop_count = 0  # Track outer loop cycles
         self.processed_queue_vertices = []  # List of vertices already processed in queue
         self.vertex_bits = [0] * (V + 1)  # Array from 0 to V, index 0 unused, bits for vertices 1 to V
-        self.processed_rows = set()  # Track which rows have been processed
+        self.row_start = None  # row_start[v]: first matrix row of vertex v (CSR offsets)
+        self.row_count = None  # row_count[v]: number of matrix rows of vertex v
+        self.row_cursor = [0] * (V + 1)  # Next unprocessed row of each vertex, relative to row_start
         
         self.adj_list = {i: [] for i in range(1, V + 1)}
         for u, v in edges:
@@ -21,48 +33,41 @@ class GraphAlgorithm:
     
     def _create_adjacency_matrix(self):
         """Create the 2V x (d+1) adjacency matrix with padding and overflow handling"""
-        self.adjacency_matrix = []
-        row_count = 0
+        edge_array = np.asarray(self.edges, dtype=np.int64).reshape(-1, 2)
         
-        for vertex in range(1, self.V + 1):
-            outgoing_edges = self.adj_list[vertex]
-            
-            # Process edges for this vertex
-            edges_processed = 0
-            while edges_processed < len(outgoing_edges):
-                current_row = [vertex]  # First element is the vertex this row belongs to
-                
-                # Fill current row with up to d edges
-                for i in range(self.d):
-                    if edges_processed < len(outgoing_edges):
-                        current_row.append(outgoing_edges[edges_processed])
-                        edges_processed += 1
-                    else:
-                        current_row.append(0)  # Dummy edge
-                
-                self.adjacency_matrix.append(current_row)
-                row_count += 1
-            
-            # If vertex has no outgoing edges, add one row with vertex marker
-            if len(outgoing_edges) == 0:
-                dummy_row = [vertex] + [0] * self.d  # Vertex marker + dummy edges
-                self.adjacency_matrix.append(dummy_row)
-                row_count += 1
+        # Group edges by source vertex, keeping each vertex's edges in input order
+        order = np.argsort(edge_array[:, 0], kind="stable")
+        sources = edge_array[order, 0]
+        targets = edge_array[order, 1]
+        
+        # Every vertex gets ceil(degree / d) rows, and at least one row with its marker
+        degrees = np.bincount(sources, minlength=self.V + 1)[1:self.V + 1]
+        self.d_selection = graph_algorithm.select_d(degrees, self.V, self.E, self.d_strategy)
+        self.d = self.d_selection["d"]
+        self._create_vertex_row_mapping(degrees)
+        used_rows = int(self.row_count.sum())
         
-        # Pad matrix to exactly 2V rows with dummy edges (vertex marker = 0)
-        while row_count < 2 * self.V:
-            dummy_row = [0] + [0] * self.d  # All dummy (vertex marker = 0)
-            self.adjacency_matrix.append(dummy_row)
-            row_count += 1
+        # Rows past used_rows stay all dummy (vertex marker = 0) up to 2V rows
+        self.adjacency_matrix = np.zeros((max(2 * self.V, used_rows), self.d + 1), dtype=np.int32)
+        self.adjacency_matrix[:used_rows, 0] = np.repeat(np.arange(1, self.V + 1), self.row_count[1:])
+        
+        # Scatter each edge to its row and column in one pass
+        edge_offset = np.zeros(self.V + 1, dtype=np.int64)
+        np.cumsum(degrees, out=edge_offset[1:])
+        rank = np.arange(len(sources)) - edge_offset[sources - 1]
+        self.adjacency_matrix[self.row_start[sources] + rank // self.d, 1 + rank % self.d] = targets
     
     def run_algorithm(self, start_vertex, n, compaction_del):
         self.outer_loop_count = 0
         queue = deque()
-        vertex_row_map = self._create_vertex_row_mapping()
+        # Plain lists: scalar indexing in the loop is cheaper than on NumPy arrays
+        row_start = self.row_start.tolist()
+        row_count = self.row_count.tolist()
 
         self.processed_queue_vertices = []
         self.vertex_bits = [0] * (self.V + 1)
-        self.processed_rows = set()
+        self.row_cursor = [0] * (self.V + 1)
+        row_cursor = self.row_cursor
 
         # Start with the starting vertex
         current_vertex = start_vertex
@@ -89,19 +94,15 @@ class GraphAlgorithm:
 
             # Add edges from current vertex to queue (process one row only)
             edges_added = False
-            if current_vertex in vertex_row_map:
-                rows_for_vertex = vertex_row_map[current_vertex]
-                row_to_process = None
-                for row_idx in rows_for_vertex:
-                    if row_idx not in self.processed_rows:
-                        row_to_process = row_idx
-                        break
-
-                if row_to_process is not None and row_to_process < len(self.adjacency_matrix):
-                    self.processed_rows.add(row_to_process)
+            valid_vertex = 1 <= current_vertex <= self.V
+            if valid_vertex:
+                # The cursor gives the next unprocessed row in O(1)
+                if row_cursor[current_vertex] < row_count[current_vertex]:
+                    row_to_process = row_start[current_vertex] + row_cursor[current_vertex]
+                    row_cursor[current_vertex] += 1
                     original_row = self.adjacency_matrix[row_to_process]
-                    vertex_marker = original_row[0]
-                    edges_in_row = original_row[1:]
+                    vertex_marker = int(original_row[0])
+                    edges_in_row = original_row[1:].tolist()
                     processed_edges = self._process_row_with_vertex_bits(edges_in_row)
                     for edge in processed_edges:
                         queue.append(edge)
@@ -113,7 +114,7 @@ class GraphAlgorithm:
                 else:
                     print(f"No more unprocessed rows for vertex {current_vertex}")
 
-            all_rows_done = all(row_idx in self.processed_rows for row_idx in vertex_row_map.get(current_vertex, []))
+            all_rows_done = not valid_vertex or row_cursor[current_vertex] == row_count[current_vertex]
 
             if all_rows_done:
                 if current_vertex not in self.processed_queue_vertices:
@@ -148,29 +149,15 @@ class GraphAlgorithm:
         print(f"\nAlgorithm completed after {self.outer_loop_count} outer loop iterations")
         print(f"Final processed queue vertices: {self.processed_queue_vertices}")
         print(f"Final vertex bits: {self.vertex_bits[1:]}")
-        print(f"Total rows processed: {len(self.processed_rows)}")
+        print(f"Total rows processed: {sum(row_cursor)}")
         return self.outer_loop_count
     
-    def _create_vertex_row_mapping(self):
-        """Create mapping from vertex to its rows in adjacency matrix"""
-        vertex_row_map = {}
-        current_row = 0
-        
-        for vertex in range(1, self.V + 1):
-            vertex_row_map[vertex] = []
-            outgoing_edges = self.adj_list[vertex]
-            
-            if len(outgoing_edges) == 0:
-                vertex_row_map[vertex].append(current_row)
-                current_row += 1
-            else:
-                edges_processed = 0
-                while edges_processed < len(outgoing_edges):
-                    vertex_row_map[vertex].append(current_row)
-                    edges_processed += self.d
-                    current_row += 1
-        
-        return vertex_row_map
+    def _create_vertex_row_mapping(self, degrees):
+        """Compute row_start / row_count offsets (indexed by vertex, index 0 unused)"""
+        self.row_count = np.zeros(self.V + 1, dtype=np.int64)
+        self.row_count[1:] = np.maximum(1, -(-np.asarray(degrees) // self.d))
+        self.row_start = np.zeros(self.V + 1, dtype=np.int64)
+        np.cumsum(self.row_count[1:-1], out=self.row_start[2:])
     
     def _process_row_with_vertex_bits(self, row):
         """
@@ -227,8 +214,8 @@ class GraphAlgorithm:
         print("Adjacency Matrix (2V x (d+1)):")
         print("Format: [vertex_marker, edge1, edge2, ..., edged]")
         for i, row in enumerate(self.adjacency_matrix):
-            vertex_marker = row[0]
-            edges = row[1:]
+            vertex_marker = int(row[0])
+            edges = row[1:].tolist()
             print(f"Row {i}: [vertex:{vertex_marker}] {edges}")
         print()
     
@@ -244,7 +231,7 @@ class GraphAlgorithm:
         """Reset the vertex tracking arrays"""
         self.processed_queue_vertices = []
         self.vertex_bits = [0] * (self.V + 1)
-        self.processed_rows = set()
+        self.row_cursor = [0] * (self.V + 1)
     
     def get_outer_loop_count(self):
         """Return the total number of outer loop iterations"""
@@ -262,6 +249,8 @@ def main():
     print("=== Algorithm Setup ===")
     print(f"Vertices: {V}, Edges: {E}")
     print(f"d = 2 * ceil({E}/{V}) + 1 = {algorithm.d}")
+    print(f"Padding ratio: {algorithm.d_selection['padding_ratio']:.2%}, "
+          f"overflow rows: {algorithm.d_selection['overflow_rows']}")
     print()
     
     
@@ -1,7 +1,12 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import argparse
+import hashlib
 import math
+import os
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".surface_cache")
+CHUNK_ROWS = 64  # n values evaluated per vectorized block in surface_minimum
 
 def calculate_d(e, v):
     """
@@ -77,22 +82,17 @@ def calculate_expression(v, e, y, n):
     
     return x
 
-def main():
-    # Get user input
-    try:
-        v = float(input("Enter the value of v: "))
-        e = float(input("Enter the value of e: "))
-    except ValueError:
-        print("Please enter valid numeric values.")
-        return
-    
+def plot_surface(v, e, y_max=100, n_max=100):
+    """Plot the surface of x over y = 1 .. y_max and n = 1 .. n_max and print its statistics"""
+    import matplotlib.pyplot as plt  # Only the plots need matplotlib; batch mode runs without it
+
     # Calculate d
     d = calculate_d(e, v)
     print(f"Calculated d = ceil(2*e/v) + 1 = {d}")
     
     # Create ranges for y and n
-    y_range = np.arange(1, 101)  # 1 to 1000
-    n_range = np.arange(1, 101)   # 1 to 100
+    y_range = np.arange(1, y_max + 1)
+    n_range = np.arange(1, n_max + 1)
     
     # Create meshgrid for 3D plotting
     Y, N = np.meshgrid(y_range, n_range)
@@ -172,5 +172,114 @@ def main():
     print(f"Number of finite values: {len(finite_values)} out of {X.size}")
     print(f"Percentage of finite values: {100 * len(finite_values) / X.size:.2f}%")
 
+def surface_minimum(v, e, y_max=1000, n_max=100, chunk_rows=CHUNK_ROWS):
+    """
+    Minimum of calculate_expression over y = 1 .. y_max and n = 1 .. n_max,
+    evaluated in blocks of chunk_rows n values so the full grid is never held
+    in memory. Ties go to the smallest n, then the smallest y, as in the plot.
+
+    Returns: (y, n, x), with x = nan where no grid point is finite
+    """
+    best = (0, 0, np.nan)
+    if v == 0:
+        return best
+    y = np.arange(1, y_max + 1)
+    for begin in range(1, n_max + 1, chunk_rows):
+        n = np.arange(begin, min(begin + chunk_rows, n_max + 1))[:, None]
+        x = calculate_expression(v, e, y[None, :], n)
+        x = np.where(np.isfinite(x), x, np.inf)
+        row, column = np.unravel_index(np.argmin(x), x.shape)
+        if x[row, column] < np.inf and not x[row, column] >= best[2]:
+            best = (int(y[column]), int(n[row, 0]), float(x[row, column]))
+    return best
+
+def batch_minimum(pairs, y_max=1000, n_max=100, chunk_rows=CHUNK_ROWS, cache_dir=CACHE_DIR):
+    """
+    surface_minimum for many (v, e) graph profiles.
+
+    Results are memoized on disk in one .npz file per (y_max, n_max) grid, so
+    repeated scans only evaluate pairs that were not seen before. Pass
+    cache_dir=None to skip the cache.
+
+    Returns: dict of arrays v, e, d, y, n and x, one entry per pair
+    """
+    pairs = np.asarray(pairs, dtype=np.float64).reshape(-1, 2)
+    cached = {}
+    path = None
+    if cache_dir is not None:
+        key = hashlib.sha1(f"{y_max},{n_max}".encode()).hexdigest()
+        path = os.path.join(cache_dir, key + ".npz")
+        if os.path.exists(path):
+            with np.load(path) as stored:
+                for row in zip(*(stored[name].tolist() for name in ("v", "e", "y", "n", "x"))):
+                    cached[row[:2]] = row[2:]
+
+    missing = [pair for pair in dict.fromkeys(map(tuple, pairs.tolist())) if pair not in cached]
+    for v, e in missing:
+        cached[(v, e)] = surface_minimum(v, e, y_max, n_max, chunk_rows)
+    if path is not None and missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        keys = list(cached)
+        np.savez(path, v=[k[0] for k in keys], e=[k[1] for k in keys],
+                 y=[cached[k][0] for k in keys], n=[cached[k][1] for k in keys], x=[cached[k][2] for k in keys])
+
+    results = [cached[pair] for pair in map(tuple, pairs.tolist())]
+    return {
+        "v": pairs[:, 0],
+        "e": pairs[:, 1],
+        "d": np.array([calculate_d(e, v) for v, e in pairs.tolist()], dtype=np.float64),
+        "y": np.array([r[0] for r in results], dtype=np.int64),
+        "n": np.array([r[1] for r in results], dtype=np.int64),
+        "x": np.array([r[2] for r in results], dtype=np.float64),
+    }
+
+def _read_pairs(path):
+    """(v, e) pairs from a text file with two numbers per line; commas and # comments are allowed"""
+    pairs = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split("#")[0].replace(",", " ").split()
+            if fields:
+                pairs.append((float(fields[0]), float(fields[1])))
+    return pairs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minimum of x = v[1-(1-(a/v)^(y-1))] - yn over y and n. "
+                                                 "Without pairs, asks for v and e and plots the surface.")
+    parser.add_argument("--pair", nargs=2, type=float, action="append", default=[], metavar=("V", "E"),
+                        help="graph profile to analyse (repeatable)")
+    parser.add_argument("--pairs-file", help="text file with one 'v e' pair per line")
+    parser.add_argument("--y-max", type=int, default=1000, help="largest y of the grid (default 1000)")
+    parser.add_argument("--n-max", type=int, default=100, help="largest n of the grid (default 100)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="n values per vectorized block")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write the on-disk results")
+    parser.add_argument("--plot", action="store_true", help="also plot the surface of every pair")
+    args = parser.parse_args(argv)
+
+    pairs = [tuple(pair) for pair in args.pair]
+    if args.pairs_file:
+        pairs += _read_pairs(args.pairs_file)
+
+    if not pairs:
+        # Get user input
+        try:
+            v = float(input("Enter the value of v: "))
+            e = float(input("Enter the value of e: "))
+        except ValueError:
+            print("Please enter valid numeric values.")
+            return
+        plot_surface(v, e)
+        return
+
+    result = batch_minimum(pairs, args.y_max, args.n_max, args.chunk_rows,
+                           cache_dir=None if args.no_cache else CACHE_DIR)
+    print(f"{'v':>12} {'e':>12} {'d':>5} {'y':>6} {'n':>6} {'min x':>16}")
+    for v, e, d, y, n, x in zip(*(result[name].tolist() for name in ("v", "e", "d", "y", "n", "x"))):
+        print(f"{v:>12g} {e:>12g} {d:>5g} {y:>6} {n:>6} {x:>16.6f}")
+    if args.plot:
+        for v, e in pairs:
+            plot_surface(v, e, min(args.y_max, 100), min(args.n_max, 100))
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,57 +1,72 @@
 import math
-import matplotlib.pyplot as plt
+
+import numpy as np
 
 def calculate_delta_min(n, d):
     x = math.log(2) * 60
-    return math.sqrt(x / (d * n))
+    return np.sqrt(x / (d * n))
+
+def calculate_cost(n, d):
+    """
+    Cost = ((1 + delta_min) * d * n) / 4: bound on the real entries added in n
+    iterations of d slots each; n and d may be NumPy arrays.
+    """
+    delta_min = calculate_delta_min(n, d)
+    return ((1 + delta_min) * d * n) / 4
+
+def main():
+    import matplotlib.pyplot as plt  # Only the plots need matplotlib; the cost model imports without it
+
+    # Parameters
+    d_values = [2, 50, 250, 1000]
+    n_values = range(1, 501, 5)
 
-# Parameters
-d_values = [2, 50, 250, 1000]
-n_values = range(1, 501, 5)
+    print("Calculating delta_min and cost function for various d, n values\n")
+    print(f"{'d':>6} {'n':>8} {'delta_min':>10} {'cost':>12}")
 
-print("Calculating delta_min and cost function for various d, n values\n")
-print(f"{'d':>6} {'n':>8} {'delta_min':>10} {'cost':>12}")
+    all_costs = {}
 
-all_costs = {}
+    # Plot each graph individually
+    for d in d_values:
+        costs = []
+        ns = []
 
-# Plot each graph individually
-for d in d_values:
-    costs = []
-    ns = []
+        for n in n_values:
+            delta_min = calculate_delta_min(n, d)
+            cost = calculate_cost(n, d)
 
-    for n in n_values:
-        delta_min = calculate_delta_min(n, d)
-        cost = ((1 + delta_min) * d * n) / 4
+            costs.append(cost)
+            ns.append(n)
 
-        costs.append(cost)
-        ns.append(n)
+            print(f"{d:6} {n:8} {delta_min:10.4f} {cost:12.2f}")
 
-        print(f"{d:6} {n:8} {delta_min:10.4f} {cost:12.2f}")
+        # Save for later
+        all_costs[d] = (ns, costs)
 
-    # Save for later
-    all_costs[d] = (ns, costs)
+        # Individual plot
+        plt.figure(figsize=(8, 5))
+        plt.plot(ns, costs, label=f'd={d}', color='blue')
+        plt.xlabel("n (number of iterations)")
+        plt.ylabel("Cost = ((1 + δ_min) × d × n) / 4")
+        plt.title(f"Cost vs n for d = {d}")
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+        plt.show()
+
+    # Combined plot
+    plt.figure(figsize=(10, 6))
+    for d in d_values:
+        ns, costs = all_costs[d]
+        plt.plot(ns, costs, label=f'd={d}')
 
-    # Individual plot
-    plt.figure(figsize=(8, 5))
-    plt.plot(ns, costs, label=f'd={d}', color='blue')
     plt.xlabel("n (number of iterations)")
     plt.ylabel("Cost = ((1 + δ_min) × d × n) / 4")
-    plt.title(f"Cost vs n for d = {d}")
-    plt.grid(True)
+    plt.title("Cost vs n for different d values (Combined Plot)")
     plt.legend()
+    plt.grid(True)
     plt.tight_layout()
     plt.show()
 
-# Combined plot
-plt.figure(figsize=(10, 6))
-for d in d_values:
-    ns, costs = all_costs[d]
-    plt.plot(ns, costs, label=f'd={d}')
-
-plt.xlabel("n (number of iterations)")
-plt.ylabel("Cost = ((1 + δ_min) × d × n) / 4")
-plt.title("Cost vs n for different d values (Combined Plot)")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+if __name__ == "__main__":
+    main()
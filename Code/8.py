@@ -0,0 +1,224 @@
+import time
+
+import numpy as np
+
+
+def _next_power_of_two(n):
+    return 1 << (n - 1).bit_length() if n > 1 else n
+
+
+def partition_compact(values):
+    """
+    Reference compaction: stable partition of real (non-zero) entries in front
+    of dummy (zero) entries. Branches on every entry, so it is not oblivious.
+
+    Returns: compacted array, compare-exchange count, swap count
+    """
+    values = np.asarray(values)
+    real = values[values != 0]
+    compacted = np.zeros_like(values)
+    compacted[:len(real)] = real
+    return compacted, 0, 0
+
+
+def _bitonic_network(keys, values=None):
+    """
+    Sort keys (length a power of two) in place with a bitonic sorting network,
+    moving values along when given. The network runs log(m)(log(m)+1)/2
+    stages of m/2 compare-exchanges; in every stage position p is paired with
+    p + j inside blocks of 2j, so the stage is one vectorized pass over a
+    (blocks, 2, j) view of the array.
+
+    Returns: compare-exchange count, swap count
+    """
+    m = len(keys)
+    comparisons = 0
+    swaps = 0
+    k = 2
+    while k <= m:
+        j = k // 2
+        while j > 0:
+            key_pairs = keys.reshape(-1, 2, j)
+            lower_keys = key_pairs[:, 0, :].copy()
+            upper_keys = key_pairs[:, 1, :].copy()
+            # Blocks of 2j inside an ascending run of length k sort up, the others down
+            ascending = ((np.arange(m // (2 * j)) * 2 * j) & k == 0)[:, None]
+            swap = (lower_keys > upper_keys) == ascending
+
+            key_pairs[:, 0, :] = np.where(swap, upper_keys, lower_keys)
+            key_pairs[:, 1, :] = np.where(swap, lower_keys, upper_keys)
+            if values is not None:
+                value_pairs = values.reshape(-1, 2, j)
+                lower_values = value_pairs[:, 0, :].copy()
+                upper_values = value_pairs[:, 1, :]
+                value_pairs[:, 0, :] = np.where(swap, upper_values, lower_values)
+                value_pairs[:, 1, :] = np.where(swap, lower_values, upper_values)
+
+            comparisons += m // 2
+            swaps += int(np.count_nonzero(swap))
+            j //= 2
+        k *= 2
+    return comparisons, swaps
+
+
+def bitonic_sort(keys, pad_key=None):
+    """
+    Sort an array with the bitonic network. The input is padded to a power of
+    two with pad_key (default: the largest value of the dtype), so the
+    schedule depends only on len(keys).
+
+    Returns: sorted array, compare-exchange count, swap count
+    """
+    keys = np.asarray(keys)
+    size = len(keys)
+    m = _next_power_of_two(size)
+    if m <= 1:
+        return keys.copy(), 0, 0
+    if pad_key is None:
+        pad_key = np.iinfo(keys.dtype).max if keys.dtype.kind in "iu" else np.inf
+    padded = np.full(m, pad_key, dtype=keys.dtype)
+    padded[:size] = keys
+    comparisons, swaps = _bitonic_network(padded)
+    return padded[:size], comparisons, swaps
+
+
+def bitonic_compact(values):
+    """
+    Compact real entries to the front with a bitonic sorting network.
+
+    Entries are sorted by the key (is_dummy, original position), so real entries
+    keep their order. The input is padded with dummies to a power of two m and
+    the network runs log(m)(log(m)+1)/2 stages of m/2 compare-exchanges each.
+    Every stage is one vectorized pass; the schedule depends only on len(values).
+
+    Returns: compacted array, compare-exchange count, swap count
+    """
+    values = np.asarray(values)
+    size = len(values)
+    m = _next_power_of_two(size)
+    if m <= 1:
+        return values.copy(), 0, 0
+
+    padded = np.zeros(m, dtype=values.dtype)
+    padded[:size] = values
+    keys = np.where(padded != 0, 0, m) + np.arange(m, dtype=np.int64)
+    comparisons, swaps = _bitonic_network(keys, padded)
+    return padded[:size], comparisons, swaps
+
+
+def goodrich_compact(values):
+    """
+    Order-preserving oblivious compaction in the style of Goodrich's tight
+    compaction network.
+
+    Each real entry at position i moves left by offset = i - (number of real
+    entries before it). The offset is routed bit by bit: in level j every
+    position p is compare-exchanged with p + 2^j and the entry moves when bit j
+    of its remaining offset is set. Routing from the low bit up never collides,
+    so ceil(log2 n) levels give O(n log n) compare-exchanges on a schedule that
+    depends only on len(values).
+
+    Returns: compacted array, compare-exchange count, swap count
+    """
+    values = np.asarray(values)
+    size = len(values)
+    compacted = values.copy()
+    if size <= 1:
+        return compacted, 0, 0
+
+    real = compacted != 0
+    offsets = np.arange(size, dtype=np.int64) - (np.cumsum(real) - 1)
+    offsets = np.where(real, offsets, 0)
+
+    comparisons = 0
+    swaps = 0
+    level = 0
+    while (1 << level) < size:
+        shift = 1 << level
+        moving = ((offsets >> level) & 1).astype(bool)
+        # Position p receives the entry from p + shift when that entry moves
+        incoming = np.zeros(size, dtype=bool)
+        incoming[:-shift] = moving[shift:]
+
+        shifted_values = np.zeros_like(compacted)
+        shifted_values[:-shift] = compacted[shift:]
+        shifted_offsets = np.zeros_like(offsets)
+        shifted_offsets[:-shift] = offsets[shift:]
+
+        stays = ~moving
+        compacted = np.where(incoming, shifted_values, np.where(stays, compacted, 0))
+        offsets = np.where(incoming, shifted_offsets, np.where(stays, offsets, 0))
+
+        comparisons += size - shift
+        swaps += int(np.count_nonzero(moving))
+        level += 1
+
+    return compacted, comparisons, swaps
+
+
+COMPACTION_ENGINES = {
+    "partition": partition_compact,
+    "bitonic": bitonic_compact,
+    "goodrich": goodrich_compact,
+}
+
+
+def compact(values, compaction_del, engine="partition"):
+    """
+    Compact a queue with the named engine and keep the first compaction_del
+    entries.
+
+    Returns: kept entries, dropped entries (both NumPy arrays)
+    """
+    if engine not in COMPACTION_ENGINES:
+        raise ValueError(f"Unknown compaction engine {engine!r}, choose from {sorted(COMPACTION_ENGINES)}")
+    compacted, _, _ = COMPACTION_ENGINES[engine](np.asarray(values, dtype=np.int64))
+    return compacted[:compaction_del], compacted[compaction_del:]
+
+
+def benchmark_compaction(sizes, engines=None, real_fraction=0.25, repeats=3, seed=42):
+    """
+    Time each compaction engine on random queues of the given sizes.
+
+    Returns: list of dicts with engine, size, compare_exchanges, swaps and
+    the best wall time in seconds over the repeats
+    """
+    engines = engines or list(COMPACTION_ENGINES)
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for size in sizes:
+        queue = np.where(rng.random(size) < real_fraction, rng.integers(1, size + 1, size), 0)
+        expected = partition_compact(queue)[0]
+
+        for engine in engines:
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                compacted, comparisons, swaps = COMPACTION_ENGINES[engine](queue)
+                best = min(best, time.perf_counter() - start)
+            if not np.array_equal(compacted, expected):
+                raise AssertionError(f"{engine} compaction differs from the reference at size {size}")
+            results.append({
+                "engine": engine,
+                "size": size,
+                "compare_exchanges": comparisons,
+                "swaps": swaps,
+                "seconds": best,
+            })
+
+    return results
+
+
+def main():
+    sizes = [100, 1000, 10_000, 100_000, 1_000_000]
+    print("Benchmarking queue compaction engines (25% real entries)\n")
+    print(f"{'engine':>10} {'size':>10} {'cmp-exch':>12} {'swaps':>12} {'time (ms)':>12}")
+
+    for result in benchmark_compaction(sizes):
+        print(f"{result['engine']:>10} {result['size']:>10} {result['compare_exchanges']:>12} "
+              f"{result['swaps']:>12} {result['seconds'] * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
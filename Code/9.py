@@ -0,0 +1,158 @@
+import numpy as np
+
+from siblings import load_script
+
+compaction = load_script(8)  # Queue compaction engines
+
+DUMMY = 0  # Dummy queue entry
+
+
+class ObliviousQueue:
+    """
+    Fixed-capacity FIFO of vertex ids backed by a preallocated ring buffer.
+
+    Between two compactions the queue grows by at most one d-wide row per
+    iteration, and each compaction leaves at most compaction_del entries, so a
+    buffer of compaction_del + n * d entries is never exceeded. The buffer is
+    allocated once; enqueue, dequeue and compaction never reallocate it.
+    """
+
+    def __init__(self, capacity, dtype=np.int32):
+        if capacity < 1:
+            raise ValueError("ObliviousQueue capacity must be at least 1")
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.head = 0  # Buffer index of the front entry
+        self.length = 0  # Number of entries in the queue
+        self.peak_length = 0  # Largest length reached
+
+    @staticmethod
+    def capacity_for(n, d, compaction_del, rows=None):
+        """
+        Entries needed when compacting to compaction_del every n rows of width
+        d. With rows, the number of rows a run can enqueue at all, neither
+        term exceeds what those rows can hold.
+        """
+        if rows is None:
+            return compaction_del + n * d
+        return min(n, rows) * d + min(compaction_del, rows * d)
+
+    @classmethod
+    def for_compaction(cls, n, d, compaction_del, rows=None, dtype=np.int32):
+        return cls(cls.capacity_for(n, d, compaction_del, rows), dtype)
+
+    @property
+    def nbytes(self):
+        """Memory footprint of the buffer, fixed for the whole run"""
+        return self.buffer.nbytes
+
+    def __len__(self):
+        return self.length
+
+    def is_empty(self):
+        return self.length == 0
+
+    def _positions(self, count, offset=0):
+        return (self.head + offset + np.arange(count)) % self.capacity
+
+    def enqueue(self, value):
+        self.conditional_enqueue(value, True)
+
+    def conditional_enqueue(self, value, condition):
+        """Enqueue value if condition holds, otherwise a dummy entry"""
+        if self.length == self.capacity:
+            raise OverflowError(f"ObliviousQueue is full ({self.capacity} entries)")
+        self.buffer[(self.head + self.length) % self.capacity] = value if condition else DUMMY
+        self.length += 1
+        self.peak_length = max(self.peak_length, self.length)
+
+    def conditional_enqueue_row(self, row, mask=None):
+        """
+        Enqueue a whole d-wide row in one vectorized write. Entries whose mask
+        is False are written as dummies, so the row always takes d slots.
+        """
+        row = np.asarray(row)
+        if self.length + len(row) > self.capacity:
+            raise OverflowError(f"ObliviousQueue is full ({self.capacity} entries)")
+        values = row if mask is None else np.where(mask, row, DUMMY)
+        self.buffer[self._positions(len(row), self.length)] = values
+        self.length += len(row)
+        self.peak_length = max(self.peak_length, self.length)
+
+    def conditional_append(self, value, condition):
+        """
+        Rewrite the tail slot either way, but only keep value in the queue if
+        condition holds. Unlike conditional_enqueue no dummy entry is stored.
+        """
+        if condition and self.length == self.capacity:
+            raise OverflowError(f"ObliviousQueue is full ({self.capacity} entries)")
+        tail = (self.head + self.length) % self.capacity
+        self.buffer[tail] = value if condition else self.buffer[tail]
+        self.length += bool(condition)
+        self.peak_length = max(self.peak_length, self.length)
+
+    def dequeue(self):
+        if self.length == 0:
+            raise IndexError("dequeue from an empty ObliviousQueue")
+        value = self.buffer[self.head].item()
+        self.head = (self.head + 1) % self.capacity
+        self.length -= 1
+        return value
+
+    def conditional_dequeue(self, condition):
+        """
+        Read the front slot either way and remove it if condition holds.
+
+        Returns: the front entry, or DUMMY if condition is false or the queue is empty
+        """
+        value = self.buffer[self.head].item()
+        take = bool(condition) and self.length > 0
+        self.head = (self.head + take) % self.capacity
+        self.length -= take
+        return value if take else DUMMY
+
+    def to_array(self):
+        """Copy of the queued entries, front first"""
+        return self.buffer[self._positions(self.length)]
+
+    def compact(self, compaction_del, engine="partition"):
+        """
+        Move real entries to the front with the named compaction engine from
+        8.py and keep the first compaction_del entries, in place.
+
+        Returns: the dropped entries
+        """
+        kept, dropped = compaction.compact(self.to_array(), compaction_del, engine)
+        self.buffer[:len(kept)] = kept
+        self.buffer[len(kept):] = DUMMY
+        self.head = 0
+        self.length = len(kept)
+        return dropped
+
+
+def main():
+    n = 3
+    d = 4
+    compaction_del = 5
+    queue = ObliviousQueue.for_compaction(n, d, compaction_del)
+    print(f"n = {n}, d = {d}, compaction_del = {compaction_del}")
+    print(f"Capacity: {queue.capacity} entries, {queue.nbytes} bytes (fixed for the run)")
+
+    rows = [[2, 3, 0, 0], [5, 0, 0, 0], [4, 1, 6, 0], [7, 0, 0, 0], [8, 9, 0, 0], [0, 0, 0, 0]]
+    visited = np.zeros(10, dtype=bool)
+    for iteration, row in enumerate(rows, start=1):
+        row = np.array(row)
+        mask = (row != DUMMY) & ~visited[row]
+        visited[row[mask]] = True
+        queue.conditional_enqueue_row(row, mask)
+        front = queue.dequeue()
+        print(f"Iteration {iteration}: dequeued {front}, queue = {queue.to_array().tolist()}")
+        if iteration % n == 0:
+            dropped = queue.compact(compaction_del, engine="goodrich")
+            print(f"  Compaction: kept {queue.to_array().tolist()}, dropped {np.count_nonzero(dropped)} real entries")
+
+    print(f"Peak length: {queue.peak_length} of {queue.capacity}")
+
+
+if __name__ == "__main__":
+    main()
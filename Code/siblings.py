@@ -0,0 +1,16 @@
+"""
+Import the numbered scripts of this directory from one another. Their file
+names are not identifiers, so they cannot use a plain import statement.
+"""
+import importlib
+import os
+import sys
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(number):
+    """Import and return the sibling script `<number>.py`, e.g. load_script(3) for 3.py"""
+    if SCRIPT_DIRECTORY not in sys.path:
+        sys.path.insert(0, SCRIPT_DIRECTORY)
+    return importlib.import_module(str(number))